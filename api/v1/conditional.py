@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+'''conditional GET: ETag, Last-Modified and Cache-Control headers, and
+304 Not Modified answers to clients holding the current representation'''
+
+from flask import current_app, jsonify, request
+from models import storage
+from os import getenv
+from werkzeug.http import is_resource_modified
+
+# string - Cache-Control header of the GET responses, none when empty
+cache_control = getenv('HBNB_API_CACHE_CONTROL', 'no-cache')
+
+
+def object_tag(obj):
+    '''returns the ETag of obj, from its id and updated_at'''
+    return '{}-{}'.format(obj.id, obj.updated_at.strftime('%Y%m%d%H%M%S%f'))
+
+
+def collection_tag(*classes):
+    '''returns the ETag of the objects of classes, from their versions'''
+    return '-'.join(storage.version(cls) for cls in classes)
+
+
+def conditional(tag, build, modified=None):
+    '''returns the response build() makes, or an empty 304 Not Modified
+    without calling it when the If-None-Match or If-Modified-Since headers
+    show that the client holds it already; both carry the weak ETag tag,
+    the Last-Modified date modified when given and cache_control'''
+    if is_resource_modified(request.environ, etag=tag,
+                            last_modified=modified):
+        resp = build()
+    else:
+        resp = current_app.response_class(status=304)
+    resp.set_etag(tag, weak=True)
+    if modified is not None:
+        resp.last_modified = modified
+    if cache_control:
+        resp.headers['Cache-Control'] = cache_control
+    return resp
+
+
+def respond_object(obj, serialize=None):
+    '''returns the conditional JSON response of obj, serialized with
+    serialize or its to_dict()'''
+    return conditional(object_tag(obj),
+                       lambda: jsonify((serialize or type(obj).to_dict)(obj)),
+                       obj.updated_at)
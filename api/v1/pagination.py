@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+'''keyset pagination and streaming of the list endpoints'''
+
+from api.v1.conditional import collection_tag, conditional
+import base64
+from datetime import datetime
+from flask import abort, current_app, request, Response, stream_with_context
+import json
+from models import storage
+from models.base_model import time
+from urllib.parse import urlencode
+
+# integer - objects serialized into each chunk of a streamed list
+batch = 100
+
+
+def pack(values):
+    '''returns the opaque cursor holding the JSON list values'''
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def unpack(cursor):
+    '''returns the list packed in cursor'''
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if type(values) is not list:
+        raise ValueError('cursor is not a list')
+    return values
+
+
+def encode_cursor(obj):
+    '''returns the opaque cursor pointing just after obj'''
+    return pack([obj.created_at.strftime(time), obj.id])
+
+
+def decode_cursor(cursor):
+    '''returns the (created_at, id) pair encoded in cursor'''
+    created_at, id = unpack(cursor)
+    if type(id) is not str:
+        raise ValueError('cursor id is not a string')
+    return datetime.strptime(created_at, time), id
+
+
+def arguments(decode=decode_cursor):
+    '''returns the limit and the position to start after given in the
+    query string, the cursor read with decode, None when missing'''
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            abort(400, 'Invalid limit')
+        if limit < 1:
+            abort(400, 'Invalid limit')
+    after = request.args.get('cursor')
+    if after is not None:
+        try:
+            after = decode(after)
+        except (ValueError, TypeError):
+            abort(400, 'Invalid cursor')
+    return limit, after
+
+
+def ordered(objs, limit=None, after=None):
+    '''sorts objs by (created_at, id) and returns up to limit of them
+    coming after the pair after, like storage.page() does'''
+    objs = sorted(objs, key=lambda obj: (obj.created_at, obj.id))
+    if after is not None:
+        objs = [obj for obj in objs if (obj.created_at, obj.id) > after]
+    return objs if limit is None else objs[:limit]
+
+
+def generate(objs, serialize, ndjson):
+    '''yields objs serialized as a JSON array, or as one JSON document
+    per line when ndjson is set, a batch of objects at a time'''
+    dumps = current_app.json.dumps
+    chunk = [] if ndjson else ['[']
+    first = True
+    for obj in objs:
+        if ndjson:
+            chunk.append(dumps(serialize(obj)) + '\n')
+        else:
+            chunk.append(('' if first else ',') + dumps(serialize(obj)))
+        first = False
+        if len(chunk) >= batch:
+            yield ''.join(chunk)
+            chunk = []
+    if not ndjson:
+        chunk.append(']\n')
+    if len(chunk) > 0:
+        yield ''.join(chunk)
+
+
+def paginate(cls, serialize=None, objs=None, **criteria):
+    '''returns a streamed response listing in (created_at, id) order
+    the objects of cls matching the criteria, or objs when given. When the
+    client asked for a limit and more objects follow, the cursor of the
+    next page is sent in the X-Next-Cursor and Link headers. The list is
+    a JSON array unless application/x-ndjson is preferred. Lists read from
+    storage are tagged with the version of cls, and not sent again to a
+    client holding the current one'''
+    limit, after = arguments()
+
+    def build():
+        '''returns the response listing the page'''
+        fetch = None if limit is None else limit + 1
+        if objs is not None:
+            found = ordered(objs, fetch, after)
+        elif limit is None:
+            found = storage.stream(cls, after, **criteria)
+        else:
+            found = storage.page(cls, fetch, after, **criteria)
+        more = limit is not None and len(found) > limit
+        if more:
+            found = found[:limit]
+        return respond(found, serialize or cls.to_dict,
+                       encode_cursor(found[-1]) if more else None)
+    if objs is not None:
+        return build()
+    tag = collection_tag(cls) + ('-ndjson' if wants_ndjson() else '')
+    resp = conditional(tag, build)
+    resp.vary.add('Accept')
+    return resp
+
+
+def wants_ndjson():
+    '''returns whether the client prefers application/x-ndjson'''
+    return request.accept_mimetypes.best_match(
+        ['application/json', 'application/x-ndjson']) == \
+        'application/x-ndjson'
+
+
+def respond(objs, serialize, cursor=None):
+    '''returns the streamed response listing objs, pointing at the next
+    page with cursor when given'''
+    ndjson = wants_ndjson()
+    resp = Response(stream_with_context(generate(objs, serialize, ndjson)),
+                    mimetype='application/x-ndjson' if ndjson
+                    else 'application/json')
+    if cursor is not None:
+        args = request.args.to_dict()
+        args['cursor'] = cursor
+        resp.headers['X-Next-Cursor'] = cursor
+        resp.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return resp
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 '''amenities blueprint'''
 
+from api.v1.conditional import respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage
@@ -10,8 +12,7 @@ from models.amenity import Amenity
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 def getamenities():
     '''get all amenities available'''
-    amens = storage.all(Amenity)
-    return jsonify([amen.to_dict() for amen in amens.values()])
+    return paginate(Amenity)
 
 
 @app_views.route('/amenities/<amenity_id>',
@@ -24,7 +25,7 @@ def getAmenityById(amenity_id=None):
     amen = storage.get(Amenity, amenity_id)
     if amen is None:
         abort(404)
-    return jsonify(amen.to_dict())
+    return respond_object(amen)
 
 
 @app_views.route('/amenities/<amenity_id>',
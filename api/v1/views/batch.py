@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+'''batch blueprint'''
+
+from api.v1.views import app_views
+from flask import jsonify, abort, request, make_response
+from models import storage, storage_t
+from models.amenity import Amenity
+from models.base_model import settable
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+# for each collection: its class, the attributes a new object needs and
+# the class of the object each of its id attributes points to
+rules = {'amenities': (Amenity, ('name',), {}),
+         'cities': (City, ('state_id', 'name'), {'state_id': State}),
+         'places': (Place, ('city_id', 'user_id', 'name'),
+                    {'city_id': City, 'user_id': User}),
+         'reviews': (Review, ('place_id', 'user_id', 'text'),
+                     {'place_id': Place, 'user_id': User}),
+         'states': (State, ('name',), {}),
+         'users': (User, ('email', 'password'), {})}
+# attributes an update leaves alone, like the PUT endpoints do
+kept = {'cities': ('state_id',), 'places': ('city_id', 'user_id'),
+        'reviews': ('place_id', 'user_id'), 'users': ('email',)}
+# integer - objects a single batch may hold
+largest = 10000
+
+
+def rejected(cls, probe, item):
+    '''returns the first attribute of item the objects of cls cannot take,
+    trying each value on probe, or None when they can take them all'''
+    for attr, value in item.items():
+        if not settable(cls, attr):
+            return attr
+        try:
+            setattr(probe, attr, value)
+        except (AttributeError, TypeError, ValueError):
+            return attr
+    return None
+
+
+@app_views.route('/<any(amenities, cities, places, reviews, states, users):'
+                 'collection>/batch', methods=['POST'], strict_slashes=False)
+def postBatch(collection):
+    '''creates the objects of a JSON array, or updates the ones whose id
+    is already stored, and returns the result of each in the same order'''
+    body = request.get_json()
+    if body is None or type(body) is not list:
+        abort(400, 'Not a JSON')
+    if len(body) > largest:
+        abort(400, 'Too many objects')
+    cls, required, references = rules[collection]
+
+    ids = [item['id'] for item in body
+           if type(item) is dict and type(item.get('id')) is str]
+    stored = {obj.id for obj in storage.filter(cls, id=ids).values()} \
+        if len(ids) > 0 else set()
+    found = {}
+    for attr, ref in references.items():
+        wanted = [item[attr] for item in body
+                  if type(item) is dict and type(item.get(attr)) is str]
+        found[attr] = {obj.id for obj in
+                       storage.filter(ref, id=wanted).values()} \
+            if len(wanted) > 0 else set()
+
+    results = [None] * len(body)
+    accepted = []
+    positions = []
+    probe = cls()
+    for i, item in enumerate(body):
+        if type(item) is not dict:
+            results[i] = {'status': 400, 'error': 'Not a JSON'}
+            continue
+        item = {key: value for key, value in item.items()
+                if key not in ('created_at', 'updated_at', '__class__')}
+        invalid = [attr for attr in ('id',) + tuple(references)
+                   if attr in item and type(item[attr]) is not str]
+        bad = invalid[0] if len(invalid) > 0 else \
+            rejected(cls, probe, item)
+        if bad is not None:
+            results[i] = {'status': 400, 'error': 'Invalid {}'.format(bad)}
+            continue
+        if item.get('id') not in stored:
+            missing = [attr for attr in required if attr not in item]
+            if len(missing) > 0:
+                results[i] = {'status': 400,
+                              'error': 'Missing {}'.format(missing[0])}
+                continue
+            if any(item[attr] not in found[attr] for attr in references):
+                results[i] = {'status': 404, 'error': 'Not found'}
+                continue
+        accepted.append(item)
+        positions.append(i)
+
+    try:
+        done = storage.bulk_upsert(cls, accepted, kept.get(collection, ()))
+    except ValueError as e:
+        abort(400, str(e))
+    for i, (obj, created) in zip(positions, done):
+        dct = obj.to_dict()
+        if storage_t == 'db':
+            dct.pop('amenities', None)
+        results[i] = {'status': 201 if created else 200, 'object': dct}
+    return make_response(jsonify(results), 200)
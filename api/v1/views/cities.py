@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 '''cities blueprint'''
 
+from api.v1.conditional import respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage
@@ -16,7 +18,7 @@ def getCity(city_id=None):
     ct = storage.get(City, city_id)
     if ct is None:
         abort(404)
-    return jsonify(ct.to_dict())
+    return respond_object(ct)
 
 
 @app_views.route('/states/<state_id>/cities',
@@ -29,8 +31,7 @@ def getCitiesInState(state_id=None):
     st = storage.get(State, state_id)
     if st is None:
         abort(404)
-    cts = st.cities
-    return jsonify([ct.to_dict() for ct in cts])
+    return paginate(City, state_id=st.id)
 
 
 @app_views.route('/cities/<city_id>',
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 '''index blueprint'''
 
+from api.v1.conditional import collection_tag, conditional
 from api.v1.views import app_views
 from flask import jsonify
 from models import storage
@@ -23,11 +24,20 @@ def status():
     return jsonify({"status": "OK"})
 
 
+@app_views.route('/metrics')
+def metrics():
+    '''returns counters describing the storage engine'''
+    return jsonify(storage.metrics())
+
+
 @app_views.route('/stats')
 def stats():
     '''retrieves the number of each objects by type'''
-    result = {}
-    for clss in classes:
-        counter = storage.count(classes[clss])
-        result[clss] = counter
-    return jsonify(result)
+    def build():
+        '''returns the response holding the counts'''
+        result = {}
+        for clss in classes:
+            counter = storage.count(classes[clss])
+            result[clss] = counter
+        return jsonify(result)
+    return conditional(collection_tag(*classes.values()), build)
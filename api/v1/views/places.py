@@ -1,14 +1,22 @@
 #!/usr/bin/python3
 '''places blueprint'''
 
+from api.v1.conditional import collection_tag, conditional, respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage, storage_t
+from models.engine.geo import position
 from models.place import Place
-from models.state import State
 from models.city import City
 from models.user import User
 
+# Place attributes /places_search accepts {"min": ..., "max": ...} for
+numeric = ('number_rooms', 'number_bathrooms', 'max_guest',
+           'price_by_night', 'latitude', 'longitude')
+# integer - places /places_near returns when k is not given
+nearest = 10
+
 
 @app_views.route('/cities/<city_id>/places',
                  methods=['GET'],
@@ -21,13 +29,7 @@ def getPlacesInCity(city_id=None):
     if ct is None:
         abort(404)
 
-    places = storage.all(Place)
-    res = []
-    for place in places.values():
-        if place.city_id == ct.id:
-            res.append(place)
-
-    return jsonify([place.to_dict() for place in res])
+    return paginate(Place, city_id=ct.id)
 
 
 @app_views.route('/places/<place_id>',
@@ -40,7 +42,7 @@ def getPlaceById(place_id=None):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
-    return jsonify(place.to_dict())
+    return respond_object(place)
 
 
 @app_views.route('/places/<place_id>',
@@ -86,83 +88,97 @@ def postPlace(city_id):
     return make_response(jsonify(place.to_dict()), 201)
 
 
+def serialize(pl):
+    '''returns the dictionary of pl without its amenities'''
+    dct = pl.to_dict()
+    if storage_t == 'db':
+        dct.pop('amenities', None)
+    return dct
+
+
 @app_views.route('/places_search', methods=['POST'], strict_slashes=False)
 def placesSearch():
     '''retrives all place objects depending on the request body'''
     body = request.get_json()
-    if body is None:
+    if body is None or type(body) is not dict:
         abort(400, 'Not a JSON')
-    keys = body.keys()
-    if len(body) <= 0\
-       or (('states' not in keys or len(body['states']) <= 0) and
-       ('cities' not in keys or len(body['cities']) <= 0)):
-        if 'amenities' not in keys:
-            places = storage.all(Place).values()
-            dcts = [pl.to_dict() for pl in places]
-            if storage_t == 'db':
-                for idx in range(len(dcts)):
-                    if 'amenities' in dcts[idx].keys():
-                        del dcts[idx]['amenities']
-            return jsonify(dcts)
-        else:
-            places = storage.all(Place).values()
-            unwanted = []
-            for idx, place in enumerate(places):
-                if storage_t == 'db':
-                    amens_ids = [m.id for m in place.amenities]
-                else:
-                    amens_ids = place.amenity_ids
-                for amenity_id in body['amenities']:
-                    if amenity_id not in amens_ids:
-                        unwanted.append(idx)
-                        break
-            for idx, i in enumerate(unwanted):
-                del places[i - idx]
-            dcts = [pl.to_dict() for pl in places]
-            if storage_t == 'db':
-                for idx in range(len(dcts)):
-                    if 'amenities' in dcts[idx].keys():
-                        del dcts[idx]['amenities']
-            return jsonify(dcts)
-
-    places = storage.all(Place).values()
-    wanted_places = []
-    cities = {}
-
-    if 'cities' in keys:
-        for cityId in body['cities']:
-            cities[cityId] = cityId
-
-    if 'states' in keys:
-        for state in storage.all(State).values():
-            if state.id in body['states']:
-                for city in state.cities:
-                    cities[city.id] = city.id
-
-    for place in places:
-        if len(cities) > 0:
-            if place.city_id in cities:
-                wanted_places.append(place)
-    unwanted = []
-    if 'amenities' in keys:
-        for idx, place in enumerate(wanted_places):
-            if storage_t == 'db':
-                amens_ids = [m.id for m in place.amenities]
-            else:
-                amens_ids = place.amenity_ids
-            for amenity_id in body['amenities']:
-                if amenity_id not in amens_ids:
-                    unwanted.append(idx)
-                    break
-
-    for idx, i in enumerate(unwanted):
-        del wanted_places[i - idx]
-    dcts = [pl.to_dict() for pl in wanted_places]
-    if storage_t == 'db':
-        for idx in range(len(dcts)):
-            if 'amenities' in dcts[idx].keys():
-                del dcts[idx]['amenities']
-    return jsonify(dcts)
+    states = body.get('states') or []
+    cities = body.get('cities') or []
+    amenities = body.get('amenities') or []
+    for attr, ids in (('states', states), ('cities', cities),
+                      ('amenities', amenities)):
+        if type(ids) is not list or any(type(i) is not str for i in ids):
+            abort(400, 'Invalid {}'.format(attr))
+
+    city_ids = None
+    if len(states) > 0 or len(cities) > 0:
+        city_ids = set(cities)
+        if len(states) > 0:
+            city_ids.update(ct.id for ct in
+                            storage.filter(City, state_id=states).values())
+
+    ranges = {}
+    for attr in numeric:
+        if attr not in body:
+            continue
+        bounds = body[attr]
+        if type(bounds) is not dict:
+            abort(400, 'Invalid {}'.format(attr))
+        for bound in ('min', 'max'):
+            value = bounds.get(bound)
+            if value is not None and (type(value) not in (int, float)):
+                abort(400, 'Invalid {}'.format(attr))
+        ranges[attr] = (bounds.get('min'), bounds.get('max'))
+
+    places = storage.search_places(city_ids, amenities, ranges)
+    if 'box' in body:
+        bounds = body['box']
+        if type(bounds) is not list or len(bounds) != 4 or \
+                position(*bounds[:2]) is None or \
+                position(*bounds[2:]) is None or bounds[0] > bounds[2]:
+            abort(400, 'Invalid box')
+        boxed = storage.within(Place, *bounds)
+        places = {key: pl for key, pl in places.items() if key in boxed}
+    return paginate(Place, serialize, places.values())
+
+
+@app_views.route('/places_near', methods=['GET'], strict_slashes=False)
+def placesNear():
+    '''retrieves the places closest to a point, nearest first'''
+    point = []
+    for arg in ('latitude', 'longitude'):
+        try:
+            point.append(float(request.args[arg]))
+        except (KeyError, ValueError):
+            abort(400, 'Invalid {}'.format(arg))
+    if position(*point) is None:
+        abort(400, 'Invalid position')
+    radius = request.args.get('radius')
+    if radius is not None:
+        try:
+            radius = float(radius)
+        except ValueError:
+            abort(400, 'Invalid radius')
+        if not radius >= 0:
+            abort(400, 'Invalid radius')
+    k = request.args.get('k', nearest)
+    try:
+        k = int(k)
+    except ValueError:
+        abort(400, 'Invalid k')
+    if k < 1:
+        abort(400, 'Invalid k')
+
+    def build():
+        '''returns the response listing the places with their distance'''
+        places = []
+        for distance, pl in storage.near(Place, point[0], point[1],
+                                         radius, k):
+            dct = serialize(pl)
+            dct['distance'] = distance
+            places.append(dct)
+        return jsonify(places)
+    return conditional(collection_tag(Place), build)
 
 
 @app_views.route('/places/<place_id>',
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 '''places amenities relationship blueprint'''
 
+from api.v1.conditional import collection_tag, conditional, object_tag
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage, storage_t
@@ -13,23 +14,17 @@ from models.amenity import Amenity
                  methods=['GET'],
                  strict_slashes=False)
 def getAmenitiesInPlace(place_id=None):
-    '''get all amenities in a place'''
+    '''get all amenities in a place, tagged with the place, changed
+    whenever an amenity is linked or unlinked, and the amenities version'''
     if place_id is None:
         abort(404)
     pl = storage.get(Place, place_id)
     if pl is None:
         abort(404)
 
-    res = []
-    if storage_t != 'db':
-        amens = storage.all(Amenity)
-        for amen in amens.values():
-            if amen.id in pl.amenity_ids:
-                res.append(amen)
-    else:
-        res = pl.amenities
-
-    return jsonify([amen.to_dict() for amen in res])
+    return conditional(object_tag(pl) + '-' + collection_tag(Amenity),
+                       lambda: jsonify([amen.to_dict()
+                                        for amen in pl.amenities]))
 
 
 @app_views.route('/places/<place_id>/amenities/<amenity_id>',
@@ -47,12 +42,8 @@ def deleteAmenityFromPlace(place_id=None, amenity_id=None):
     if storage_t != 'db':
         if amenity.id not in place.amenity_ids:
             abort(404)
-        index = None
-        for idx, id in enumerate(place.amenity_ids):
-            if amenity.id == id:
-                index = idx
-                break
-        del place.amenity_ids[index]
+        place.amenity_ids = [id for id in place.amenity_ids
+                             if id != amenity.id]
         place.save()
     else:
         index = None
@@ -86,7 +77,7 @@ def linkAmenityToPlace(place_id=None, amenity_id=None):
         if amenity_id in place.amenity_ids:
             return make_response(jsonify(amenity.to_dict()), 200)
         else:
-            place.amenity_ids.append(amenity_id)
+            place.amenity_ids = place.amenity_ids + [amenity_id]
             place.save()
             return make_response(jsonify(amenity.to_dict()), 201)
     else:
@@ -2,6 +2,8 @@
 '''reviews blueprint'''
 
 import re
+from api.v1.conditional import respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage
@@ -21,13 +23,7 @@ def getReviewsInPlace(place_id=None):
     if pl is None:
         abort(404)
 
-    reviews = storage.all(Review)
-    res = []
-    for rev in reviews.values():
-        if rev.place_id == pl.id:
-            res.append(rev)
-
-    return jsonify([rev.to_dict() for rev in res])
+    return paginate(Review, place_id=pl.id)
 
 
 @app_views.route('/reviews/<review_id>',
@@ -40,7 +36,7 @@ def getReviewById(review_id=None):
     review = storage.get(Review, review_id)
     if review is None:
         abort(404)
-    return jsonify(review.to_dict())
+    return respond_object(review)
 
 
 @app_views.route('/reviews/<review_id>',
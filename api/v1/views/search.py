@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+'''search blueprint'''
+
+from api.v1.conditional import collection_tag, conditional
+from api.v1.pagination import arguments, pack, respond, unpack, wants_ndjson
+from api.v1.views import app_views
+from flask import abort, request
+from models import storage, storage_t
+from models.place import Place
+from models.review import Review
+
+# classes /search looks in, by the name ?type= takes
+searchable = {'Place': Place, 'Review': Review}
+
+
+def decode_hit(cursor):
+    '''returns the (score, key) pair packed in cursor'''
+    score, key = unpack(cursor)
+    if type(score) not in (int, float) or type(key) is not str:
+        raise ValueError('cursor is not a search hit')
+    return score, key
+
+
+@app_views.route('/search', methods=['GET'], strict_slashes=False)
+def textSearch():
+    '''retrieves the places and reviews whose text matches q, best first'''
+    query = request.args.get('q', '')
+    if query.strip() == '':
+        abort(400, 'Missing q')
+    name = request.args.get('type')
+    if name is not None and name not in searchable:
+        abort(400, 'Invalid type')
+    limit, after = arguments(decode_hit)
+
+    def serialize(hit):
+        '''returns the dictionary of the object of hit with its score'''
+        score, obj = hit
+        dct = obj.to_dict()
+        if storage_t == 'db':
+            dct.pop('amenities', None)
+        dct['score'] = score
+        return dct
+
+    def build():
+        '''returns the response listing the hits'''
+        found = storage.search(query, searchable.get(name),
+                               None if limit is None else limit + 1, after)
+        cursor = None
+        if limit is not None and len(found) > limit:
+            found = found[:limit]
+            score, obj = found[-1]
+            cursor = pack([score, obj.__class__.__name__ + '.' + obj.id])
+        return respond(found, serialize, cursor)
+    classes = searchable.values() if name is None else [searchable[name]]
+    tag = collection_tag(*classes) + ('-ndjson' if wants_ndjson() else '')
+    resp = conditional(tag, build)
+    resp.vary.add('Accept')
+    return resp
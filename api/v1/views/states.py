@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 '''states blueprint'''
 
+from api.v1.conditional import respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage
@@ -12,16 +14,12 @@ from models.state import State
 def getStates(state_id=None):
     '''gets all states or state with the id passed'''
     if state_id is None:
-        res = []
-        states = storage.all(State)
-        for state in states.values():
-            res.append(state.to_dict())
-        return jsonify(res)
+        return paginate(State)
 
     res = storage.get(State, state_id)
     if res is None:
         abort(404)
-    return jsonify(res.to_dict())
+    return respond_object(res)
 
 
 @app_views.route('/states/<state_id>',
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 '''users blueprint'''
 
+from api.v1.conditional import respond_object
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, abort, request, make_response
 from models import storage
@@ -14,13 +16,12 @@ from models.user import User
 def getUserById(user_id=None):
     '''gets user by id'''
     if user_id is None:
-        users = storage.all(User)
-        return jsonify([user.to_dict() for user in users.values()])
+        return paginate(User)
 
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
-    return jsonify(user.to_dict())
+    return respond_object(user)
 
 
 @app_views.route('/users/<user_id>',
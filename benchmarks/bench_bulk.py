@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+""" Compares saving objects one at a time with FileStorage.bulk_new() and
+FileStorage.bulk_upsert()
+usage: python3 -m benchmarks.bench_bulk [count]
+(run from the repository root; count defaults to 2000)
+
+Every save() of the first run rewrites the whole snapshot, so it slows
+down as the store grows; set HBNB_FILE_JOURNAL to compare with appending
+to the journal instead.
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+def timed(label, count, run):
+    """prints how many objects per second run() stores"""
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print("{:>22} {:>12.0f}".format(label, count / elapsed))
+
+
+def fresh(directory, name):
+    """returns a FileStorage writing to an empty file of directory"""
+    path = os.path.join(directory, name)
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    return FileStorage()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        print("{} states".format(count))
+        print("{:>22} {:>12}".format("", "objects/s"))
+        storage = fresh(tmp, "single.json")
+
+        def single():
+            """saves after each new object"""
+            for i in range(count):
+                storage.new(State(name=str(i)))
+                storage.save()
+        timed("new() + save()", count, single)
+
+        storage = fresh(tmp, "bulk.json")
+        states = [State(name=str(i)) for i in range(count)]
+        timed("bulk_new()", count,
+              lambda: storage.bulk_new(states))
+        dicts = [{"id": state.id, "name": state.name + "!"}
+                 for state in states[::2]] + \
+            [{"name": str(i)} for i in range(count // 2)]
+        timed("bulk_upsert()", len(dicts),
+              lambda: storage.bulk_upsert(State, dicts))
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+""" Replays skewed reads on ObjectCache and SharedCache to help size
+HBNB_MYSQL_CACHE_SIZE
+usage: python3 -m benchmarks.bench_cache [objects] [reads]
+(run from the repository root; objects defaults to 100000 and reads to
+200000)
+
+A few objects are read far more often than the rest, like popular places
+and the states and cities around them: the object of rank r is read with
+a probability proportional to 1 / r. Every miss stores the object, as
+DBStorage.get() does after its query. The shared cache, slower, only
+replays the first tenth of the reads, so it warms up less.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from models.engine.cache import ObjectCache, SharedCache
+
+sizes = (100, 1000, 10000)
+
+
+def run(cache, keys):
+    """returns the hit rate and the microseconds a read takes"""
+    value = {"id": "x", "name": "Place", "price_by_night": 100}
+    start = time.perf_counter()
+    for key in keys:
+        if cache.get(key) is None:
+            cache.put(key, value)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    return stats["hits"] / len(keys), elapsed / len(keys) * 1e6
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    rand = random.Random(0)
+    weights = [1 / rank for rank in range(1, objects + 1)]
+    keys = ["Place.{}".format(i)
+            for i in rand.choices(range(objects), weights, k=reads)]
+    print("{} objects, {} reads".format(objects, reads))
+    print("{:>12} {:>6} {:>10} {:>10}".format("", "size", "hit rate",
+                                              "us/read"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            rate, us = run(ObjectCache(size, 3600), keys)
+            print("{:>12} {:>6} {:>10.3f} {:>10.2f}".format(
+                "in process", size, rate, us))
+            path = os.path.join(tmp, "{}.db".format(size))
+            rate, us = run(SharedCache(path, size, 3600), keys[:reads // 10])
+            print("{:>12} {:>6} {:>10.3f} {:>10.2f}".format(
+                "shared", size, rate, us))
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+""" Compares the Grid behind FileStorage.near()/within() with a scan of
+every place
+usage: python3 -m benchmarks.bench_geo [count] [queries]
+(run from the repository root; count defaults to 1000000 and queries
+to 200)
+
+Half of the points are spread over the globe, half clustered in a few
+cities, and the queries are centered on random points of either kind.
+"""
+import random
+import sys
+import time
+from models.engine.geo import Grid, distance
+
+
+def scan_near(points, lat, lng, radius=None, k=None):
+    """returns what Grid.near() does, from a scan of every point"""
+    pairs = ((distance(lat, lng, *point), key)
+             for key, point in points.items())
+    if radius is not None:
+        pairs = [pair for pair in pairs if pair[0] <= radius]
+    return sorted(pairs)[:k]
+
+
+def timed(label, queries, run):
+    """prints the mean milliseconds run() takes per query"""
+    start = time.perf_counter()
+    for query in queries:
+        run(*query)
+    elapsed = time.perf_counter() - start
+    print("{:>28} {:>12.3f}".format(label, elapsed / len(queries) * 1000))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rand = random.Random(0)
+    cities = [(rand.uniform(-60, 70), rand.uniform(-180, 180))
+              for _ in range(50)]
+    points = {}
+    for i in range(count):
+        if i % 2:
+            lat, lng = cities[i % len(cities)]
+            lat, lng = rand.gauss(lat, 0.3), rand.gauss(lng, 0.3)
+            lat = max(-90.0, min(90.0, lat))
+            lng = (lng + 180) % 360 - 180
+        else:
+            lat, lng = rand.uniform(-90, 90), rand.uniform(-180, 180)
+        points["Place.{}".format(i)] = (lat, lng)
+    keys = list(points)
+    queries = [points[rand.choice(keys)] for _ in range(rounds)]
+
+    grid = Grid()
+    start = time.perf_counter()
+    for key, (lat, lng) in points.items():
+        grid.set(key, lat, lng)
+    print("grid of {} points built in {:.2f}s".format(
+        count, time.perf_counter() - start))
+
+    sample = queries[:max(1, rounds // 50)]
+    for query in sample:
+        assert grid.near(*query, k=10) == scan_near(points, *query, k=10)
+    print("{:>28} {:>12}".format("query", "ms"))
+    timed("near, k=10", queries, lambda lat, lng: grid.near(lat, lng, k=10))
+    timed("near, 25 km", queries, lambda lat, lng: grid.near(lat, lng, 25))
+    timed("within, 0.5 degree box", queries,
+          lambda lat, lng: grid.within(lat - 0.25, lng - 0.25,
+                                       lat + 0.25, lng + 0.25))
+    timed("scan, k=10", sample,
+          lambda lat, lng: scan_near(points, lat, lng, k=10))
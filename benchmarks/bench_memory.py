@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+""" Compares the resident memory FileStorage.reload() leaves per object,
+and what is still held after a save() serializes every object
+usage: python3 -m benchmarks.bench_memory [count]
+(run from the repository root; count defaults to 200000)
+
+Each layout is loaded in a fresh interpreter:
+  constructor - objects built by __init__, as reload() used to
+  default     - objects built by _from_storage(), sharing their dict keys
+  compact     - default plus HBNB_FILE_COMPACT=1, interning the ids
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+modes = ("constructor", "default", "compact")
+
+
+def uid(prefix, i):
+    """returns a uuid shaped id"""
+    return "{:08x}-0000-4000-8000-{:012x}".format(prefix, i)
+
+
+def write_snapshot(path, count):
+    """writes a JSON snapshot of count places spread over a few cities,
+    users and amenities"""
+    stamp = "2022-02-05T08:59:46.459426"
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(count):
+            place_id = uid(1, i)
+            record = {"__class__": "Place", "id": place_id,
+                      "created_at": stamp, "updated_at": stamp,
+                      "city_id": uid(2, i % 500),
+                      "user_id": uid(3, i % 5000),
+                      "name": "Place number {}".format(i),
+                      "number_rooms": i % 7, "price_by_night": i % 400,
+                      "latitude": 37.77 + i * 1e-6,
+                      "longitude": -122.41 - i * 1e-6,
+                      "amenity_ids": [uid(4, i % 40), uid(4, i % 13)]}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps("Place." + place_id),
+                                      json.dumps(record)))
+        f.write("}")
+
+
+def resident():
+    """returns the resident set size of this process in bytes"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def child(mode, path):
+    """reloads path in this process and prints the memory it kept"""
+    if mode == "compact":
+        os.environ["HBNB_FILE_COMPACT"] = "1"
+    os.environ.pop("HBNB_TYPE_STORAGE", None)
+    import gc
+    from models.base_model import BaseModel
+    from models.engine.file_storage import FileStorage
+    if mode == "constructor":
+        BaseModel._from_storage = classmethod(lambda cls, dct: cls(**dct))
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    storage = FileStorage()
+    gc.collect()
+    before = resident()
+    storage.reload()
+    gc.collect()
+    loaded = resident()
+    FileStorage._FileStorage__file_path = path + ".saved"
+    storage.save()
+    gc.collect()
+    print(loaded - before, resident() - before, len(storage.all()))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        write_snapshot(path, count)
+        print("{:>12} {:>14} {:>14}".format("layout", "MiB per 1M",
+                                            "after save"))
+        for mode in modes:
+            out = subprocess.check_output([sys.executable, "-m",
+                                           "benchmarks.bench_memory",
+                                           "--child", mode, path])
+            used, saved, loaded = map(int, out.split())
+            assert loaded == count
+            print("{:>12} {:>14.0f} {:>14.0f}".format(
+                mode, used / count * 1e6 / 2 ** 20,
+                saved / count * 1e6 / 2 ** 20))
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+""" Loads a MeteredPool from many threads to help size HBNB_MYSQL_POOL_SIZE
+usage: python3 -m benchmarks.bench_pool [threads] [url]
+(run from the repository root; threads defaults to 32 and url to a
+temporary SQLite file standing in for MySQL)
+
+Each thread runs queries holding its connection for about 5 ms, like a
+request doing some work between queries. The pool sizes are tried with
+no overflow, so the threads left without a connection wait for one.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from models.engine.pool import MeteredPool
+from sqlalchemy import create_engine, text
+
+sizes = (2, 5, 10, 20)
+queries = 50
+
+
+def run(url, size, threads):
+    """returns the queries per second and the pool stats of a run"""
+    engine = create_engine(url, poolclass=MeteredPool, pool_size=size,
+                           max_overflow=0, pool_timeout=60)
+
+    def work():
+        """runs queries holding the connection for a while"""
+        for i in range(queries):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                time.sleep(0.005)
+
+    workers = [threading.Thread(target=work) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = engine.pool.stats()
+    engine.dispose()
+    return threads * queries / elapsed, stats
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    with tempfile.TemporaryDirectory() as tmp:
+        url = sys.argv[2] if len(sys.argv) > 2 else \
+            "sqlite:///" + os.path.join(tmp, "pool.db")
+        print("{} threads x {} queries".format(threads, queries))
+        print("{:>6} {:>10} {:>14} {:>14}".format(
+            "size", "queries/s", "mean wait ms", "max wait ms"))
+        for size in sizes:
+            rate, stats = run(url, size, threads)
+            print("{:>6} {:>10.0f} {:>14.2f} {:>14.2f}".format(
+                size, rate, stats["wait_ms"] / stats["checkouts"],
+                stats["max_wait_ms"]))
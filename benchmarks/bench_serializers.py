@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+""" Compares save and reload throughput of the FileStorage serializers
+usage: python3 -m benchmarks.bench_serializers [count ...]
+(run from the repository root; counts default to 10000 100000)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine import serializers
+
+
+def records(count):
+    """yields count synthetic Place records shaped like to_dict()"""
+    for i in range(count):
+        key = "Place.{:08d}-0000-4000-8000-000000000000".format(i)
+        yield key, {"__class__": "Place", "id": key[6:],
+                    "created_at": "2022-02-05T08:59:46.459426",
+                    "updated_at": "2022-02-05T08:59:46.459426",
+                    "city_id": "c-{}".format(i % 500),
+                    "user_id": "u-{}".format(i % 5000),
+                    "name": "Place number {}".format(i),
+                    "description": "A quiet place " * 4,
+                    "number_rooms": i % 7, "number_bathrooms": i % 3,
+                    "max_guest": i % 11, "price_by_night": i % 400,
+                    "latitude": 37.77 + i * 1e-6,
+                    "longitude": -122.41 - i * 1e-6,
+                    "amenity_ids": ["a-{}".format(i % 40)]}
+
+
+def bench(name, count, path):
+    """returns the save and load seconds and file size for one run"""
+    serializer = serializers.get(name)
+    data = list(records(count))
+    start = time.perf_counter()
+    with open(path, "wb") as f:
+        f.write(serializer.header)
+        serializer.dump(iter(data), f)
+    saved = time.perf_counter() - start
+    del data
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        loaded = sum(1 for _ in serializers.detect(f, name).load(f))
+    assert loaded == count
+    return saved, time.perf_counter() - start, os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    print("{:>9} {:>8} {:>12} {:>12} {:>9}".format(
+        "objects", "format", "save obj/s", "load obj/s", "MiB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            for name in serializers.serializers:
+                try:
+                    saved, loaded, size = bench(name, count,
+                                                os.path.join(tmp, name))
+                except ValueError as e:
+                    print("{:>9} {:>8} skipped: {}".format(count, name, e))
+                    continue
+                print("{:>9} {:>8} {:>12.0f} {:>12.0f} {:>9.1f}".format(
+                    count, name, count / saved, count / loaded,
+                    size / 2 ** 20))
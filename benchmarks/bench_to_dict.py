@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+""" Compares BaseModel.to_dict() with the strftime version it replaced
+usage: python3 -m benchmarks.bench_to_dict [count]
+(run from the repository root; count defaults to 100000)
+"""
+import sys
+import time
+import models
+from models.base_model import to_dicts
+from models.place import Place
+
+
+def legacy_to_dict(obj):
+    """the former BaseModel.to_dict()"""
+    new_dict = obj.__dict__.copy()
+    if "created_at" in new_dict:
+        new_dict["created_at"] = new_dict["created_at"].strftime(
+            models.base_model.time)
+    if "updated_at" in new_dict:
+        new_dict["updated_at"] = new_dict["updated_at"].strftime(
+            models.base_model.time)
+    new_dict["__class__"] = obj.__class__.__name__
+    if "_sa_instance_state" in new_dict:
+        del new_dict["_sa_instance_state"]
+    if models.storage_t == "db" and new_dict.get('password', None):
+        del new_dict['password']
+    return new_dict
+
+
+def timed(label, count, run):
+    """prints how many objects per second run() serializes"""
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print("{:>22} {:>12.0f}".format(label, count / elapsed))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    objs = [Place(city_id="c-{}".format(i % 500), name="Place {}".format(i),
+                  number_rooms=i % 7, amenity_ids=["a-{}".format(i % 40)])
+            for i in range(count)]
+    print("{:>22} {:>12}".format("to_dict of {}".format(count), "obj/s"))
+    timed("legacy", count, lambda: [legacy_to_dict(o) for o in objs])
+    timed("to_dict", count, lambda: [o.to_dict() for o in objs])
+    timed("to_dicts", count, lambda: list(to_dicts(objs)))
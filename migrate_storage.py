@@ -0,0 +1,23 @@
+#!/usr/bin/python3
+""" Rewrites a FileStorage snapshot in another serializer format
+usage: ./migrate_storage.py <json|orjson|frames|msgpack> [file.json]
+"""
+import sys
+from models.engine import serializers
+
+
+def migrate(name, path="file.json"):
+    """streams the records of path, in whatever format it holds, into a
+    new file written with the serializer name, then swaps it in"""
+    target = serializers.get(name)
+    with open(path, "rb") as src:
+        serializers.write(path, target, serializers.detect(src).load(src))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    migrate(*sys.argv[1:])
+    print("set HBNB_FILE_FORMAT={} to keep saving in this format".format(
+        sys.argv[1]))
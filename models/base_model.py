@@ -12,6 +12,8 @@ from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# dictionary - the keys to_dict() leaves out, by class
+plans = {}
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -23,7 +25,7 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(DateTime, default=datetime.utcnow, index=True)
         updated_at = Column(DateTime, default=datetime.utcnow)
 
     def __init__(self, *args, **kwargs):
@@ -47,6 +49,28 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def _from_storage(cls, dct):
+        """returns the instance whose to_dict() was dct, trusting its values:
+        they are stored without going through __init__ or __setattr__ (so a
+        User password is not hashed again) and the timestamps are parsed
+        with fromisoformat, once when both are equal. Setting them one by
+        one in a fixed order keeps the keys of the instance dictionary
+        shared by the whole class. Only for file storage, the database
+        builds its own instances"""
+        obj = cls.__new__(cls)
+        stamps = {}
+        for key, value in dct.items():
+            if key == "__class__":
+                continue
+            if (key == "created_at" or key == "updated_at") and \
+                    type(value) is str:
+                if value not in stamps:
+                    stamps[value] = datetime.fromisoformat(value)
+                value = stamps[value]
+            object.__setattr__(obj, key, value)
+        return obj
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -60,18 +84,57 @@ class BaseModel:
 
     def to_dict(self):
         """returns a dictionary containing all keys/values of the instance"""
+        plan = plans.get(self.__class__) or dict_plan(self.__class__)
         new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+        for key in plan:
+            if key in new_dict:
+                del new_dict[key]
+        created_at = new_dict.get("created_at")
+        updated_at = new_dict.get("updated_at")
+        if created_at is not None:
+            new_dict["created_at"] = stamp(created_at)
+        if updated_at is not None:
+            new_dict["updated_at"] = new_dict["created_at"] \
+                if updated_at is created_at else stamp(updated_at)
         new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
-        if models.storage_t == "db" and new_dict.get('password', None):
-            del new_dict['password']
         return new_dict
 
     def delete(self):
         """delete the current instance from the storage"""
         models.storage.delete(self)
+
+
+def stamp(value):
+    """returns value formatted like time, or value when not a datetime"""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="microseconds")
+    return value
+
+
+def settable(cls, attr):
+    """tells whether a dictionary may set attr on the objects of cls: it is
+    not a computed property nor, in db mode, a relationship"""
+    if isinstance(getattr(cls, attr, None), property):
+        return False
+    if models.storage_t == "db" and \
+            attr in sqlalchemy.inspect(cls).relationships:
+        return False
+    return True
+
+
+def dict_plan(cls):
+    """returns, and remembers, the keys to_dict() leaves out for cls: the
+    SQLAlchemy state and, in db mode, the password of classes that have
+    one"""
+    plan = ("_sa_instance_state",)
+    if models.storage_t == "db" and hasattr(cls, "password"):
+        plan += ("password",)
+    plans[cls] = plan
+    return plan
+
+
+def to_dicts(objs):
+    """yields the to_dict() of every object of objs, without building a
+    list of them"""
+    for obj in objs:
+        yield obj.to_dict()
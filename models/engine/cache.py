@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""
+Contains the ObjectCache and SharedCache classes
+"""
+
+from collections import OrderedDict
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class ObjectCache:
+    """size-bounded mapping whose entries expire ttl seconds after they
+    are stored, evicting the least recently read entry when full"""
+
+    def __init__(self, size, ttl, clock=time.monotonic):
+        """initializes an empty cache of at most size entries"""
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        """returns the number of entries held, expired ones included"""
+        return len(self.__entries)
+
+    def get(self, key):
+        """returns the value stored under key, or None when it is missing
+        or expired"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self.__entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """stores value under key, evicting the least recently read
+        entries beyond size"""
+        with self.__lock:
+            self.__entries[key] = (self.clock() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        """removes the entry of key if there is one"""
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """removes every entry"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """returns the size of the cache and its counters"""
+        return {"size": self.size, "entries": len(self),
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations}
+
+
+class SharedCache(ObjectCache):
+    """ObjectCache kept in a SQLite file, so that every process opening
+    the same path reads and invalidates the same entries; values are
+    pickled and the counters are those of the current process"""
+
+    def __init__(self, path, size, ttl, clock=time.time):
+        """opens, or creates, the cache file at path"""
+        super().__init__(size, ttl, clock)
+        self.path = path
+        self.__local = threading.local()
+        self.__counting = threading.Lock()
+        conn = self.__connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS objects (key TEXT "
+                     "PRIMARY KEY, value BLOB, expires REAL, used REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS objects_used "
+                     "ON objects (used)")
+
+    def __connection(self):
+        """returns the connection of the current thread"""
+        conn = getattr(self.__local, "conn", None)
+        if conn is None or self.__local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.__local.conn = conn
+            self.__local.pid = os.getpid()
+        return conn
+
+    def __count(self, counter, n=1):
+        """adds n to the counter named counter"""
+        with self.__counting:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def __len__(self):
+        """returns the number of entries in the file"""
+        return self.__connection().execute(
+            "SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def get(self, key):
+        """returns the value stored under key by any process, or None when
+        it is missing or expired"""
+        conn = self.__connection()
+        now = self.clock()
+        row = conn.execute("SELECT value, expires FROM objects WHERE key = ?",
+                           (key,)).fetchone()
+        if row is not None and row[1] <= now:
+            conn.execute("DELETE FROM objects WHERE key = ?", (key,))
+            self.__count("expirations")
+            row = None
+        if row is None:
+            self.__count("misses")
+            return None
+        conn.execute("UPDATE objects SET used = ? WHERE key = ?", (now, key))
+        self.__count("hits")
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        """stores value under key, evicting the least recently read
+        entries beyond size"""
+        conn = self.__connection()
+        now = self.clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                         (key, pickle.dumps(value), now + self.ttl, now))
+            extra = len(self) - self.size
+            if extra > 0:
+                conn.execute("DELETE FROM objects WHERE key IN (SELECT key "
+                             "FROM objects ORDER BY used LIMIT ?)", (extra,))
+                self.__count("evictions", extra)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def discard(self, key):
+        """removes the entry of key if there is one"""
+        self.__connection().execute("DELETE FROM objects WHERE key = ?",
+                                    (key,))
+
+    def clear(self):
+        """removes every entry"""
+        self.__connection().execute("DELETE FROM objects")
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Contains the Columns class
+"""
+
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def number(value):
+    """returns value as a float, or NaN when it is not a number"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return float("nan")
+
+
+class Columns:
+    """keeps numeric attributes of the objects of one class in one array
+    of doubles per attribute, a row per object, so that range filters run
+    over the arrays instead of the objects. Rows stay packed: a removed
+    row is filled with the last one"""
+
+    def __init__(self, fields):
+        """initializes empty columns for the attributes in fields"""
+        self.fields = tuple(fields)
+        self.__arrays = {field: array("d") for field in self.fields}
+        self.__rows = {}
+        self.__keys = []
+
+    def __len__(self):
+        """returns the number of rows"""
+        return len(self.__keys)
+
+    @property
+    def vectorized(self):
+        """tells whether select() runs on numpy"""
+        return numpy is not None
+
+    def set(self, key, obj):
+        """stores the attributes of obj in the row of key"""
+        row = self.__rows.get(key)
+        if row is None:
+            self.__rows[key] = len(self.__keys)
+            self.__keys.append(key)
+            for field in self.fields:
+                self.__arrays[field].append(number(getattr(obj, field, None)))
+        else:
+            for field in self.fields:
+                self.__arrays[field][row] = number(getattr(obj, field, None))
+
+    def get(self, key, field):
+        """returns the value of field stored for key, None without a row"""
+        row = self.__rows.get(key)
+        return None if row is None else self.__arrays[field][row]
+
+    def matches(self, key, ranges):
+        """tells whether the row of key lies within ranges, like select()"""
+        row = self.__rows.get(key)
+        if row is None:
+            return False
+        for field, (low, high) in ranges.items():
+            value = self.__arrays[field][row]
+            if low is not None and not value >= low:
+                return False
+            if high is not None and not value <= high:
+                return False
+        return True
+
+    def remove(self, key):
+        """drops the row of key"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.__keys) - 1
+        if row != last:
+            moved = self.__keys[last]
+            self.__keys[row] = moved
+            self.__rows[moved] = row
+            for column in self.__arrays.values():
+                column[row] = column[last]
+        self.__keys.pop()
+        for column in self.__arrays.values():
+            column.pop()
+
+    def select(self, ranges):
+        """returns the keys whose values lie within ranges, a dictionary of
+        field: (low, high) where either bound may be None; NaN never
+        matches a bound"""
+        if len(self.__keys) == 0:
+            return []
+        if numpy is not None:
+            mask = numpy.ones(len(self.__keys), dtype=bool)
+            for field, (low, high) in ranges.items():
+                column = numpy.frombuffer(self.__arrays[field])
+                if low is not None:
+                    mask &= column >= low
+                if high is not None:
+                    mask &= column <= high
+            return [self.__keys[row] for row in numpy.flatnonzero(mask)]
+        rows = None
+        for field, (low, high) in ranges.items():
+            if low is None and high is None:
+                continue
+            low = float("-inf") if low is None else low
+            high = float("inf") if high is None else high
+            column = self.__arrays[field]
+            if rows is None:
+                rows = [row for row, value in enumerate(column)
+                        if low <= value <= high]
+            else:
+                rows = [row for row in rows if low <= column[row] <= high]
+        if rows is None:
+            return list(self.__keys)
+        return [self.__keys[row] for row in rows]
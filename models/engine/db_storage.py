@@ -5,25 +5,65 @@ Contains the class DBStorage
 
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, settable
 from models.city import City
+from models.engine import geo
+from models.engine.cache import ObjectCache, SharedCache
+from models.engine.pool import MeteredPool
+from models.engine.text import TextIndex, tokenize
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from datetime import datetime
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import Column, Integer, String, Table, and_, \
+    create_engine, event, exc, func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import joinedload, make_transient_to_detached, \
+    scoped_session, selectinload, sessionmaker
+from sqlalchemy.orm.attributes import instance_state, manager_of_class, \
+    set_committed_value
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes bulk_upsert() never updates
+fixed = ("id", "created_at", "updated_at", "__class__")
+# text columns of each class search() looks in, under a FULLTEXT index
+searchable = {"Place": ("name", "description"), "Review": ("text",)}
+# changes committed to the rows of each class, counted by version()
+if models.storage_t == 'db':
+    versions = Table('collection_versions', Base.metadata,
+                     Column('name', String(60), primary_key=True),
+                     Column('version', Integer, nullable=False, default=0))
 
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # integer - rows stream() fetches per query
+    __stream_batch = 1000
+    # integer - objects bulk_new() and bulk_upsert() commit at a time
+    __bulk_batch = 1000
+    # integer - connections the pool keeps open
+    __pool_size = int(getenv('HBNB_MYSQL_POOL_SIZE', '5') or 5)
+    # integer - connections opened beyond pool_size under load
+    __max_overflow = int(getenv('HBNB_MYSQL_MAX_OVERFLOW', '10') or 10)
+    # float - seconds a checkout waits for a connection before failing
+    __pool_timeout = float(getenv('HBNB_MYSQL_POOL_TIMEOUT', '30') or 30)
+    # integer - seconds after which a connection is replaced, -1 never
+    __pool_recycle = int(getenv('HBNB_MYSQL_POOL_RECYCLE', '-1') or -1)
+    # boolean - whether connections are tested before each checkout
+    __pool_pre_ping = getenv('HBNB_MYSQL_POOL_PRE_PING') == '1'
+    # integer - objects get() keeps in its cache, 0 for no cache
+    __cache_size = int(getenv('HBNB_MYSQL_CACHE_SIZE', '0') or 0)
+    # float - seconds an object stays in the cache
+    __cache_ttl = float(getenv('HBNB_MYSQL_CACHE_TTL', '60') or 60)
+    # string - file sharing the cache between processes, None for none
+    __cache_path = getenv('HBNB_MYSQL_CACHE_PATH') or None
+    __cache = None
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -36,16 +76,27 @@ class DBStorage:
                                       format(HBNB_MYSQL_USER,
                                              HBNB_MYSQL_PWD,
                                              HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+                                             HBNB_MYSQL_DB),
+                                      poolclass=MeteredPool,
+                                      pool_size=self.__pool_size,
+                                      max_overflow=self.__max_overflow,
+                                      pool_timeout=self.__pool_timeout,
+                                      pool_recycle=self.__pool_recycle,
+                                      pool_pre_ping=self.__pool_pre_ping)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, *, load=None):
+        """query on the current database session; load names the
+        relationships of cls to load along, see __options()"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                query = self.__session.query(classes[clss])
+                if cls is not None and load:
+                    query = query.options(*self.__options(classes[clss],
+                                                          load))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -54,36 +105,467 @@ class DBStorage:
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__forget(obj)
 
     def save(self):
         """commit all changes of the current database session"""
         self.__session.commit()
 
+    def bulk_new(self, objs):
+        """adds every object of objs to the session and commits them
+        __bulk_batch at a time, the rows of a class in one executemany
+        INSERT per batch"""
+        objs = list(objs)
+        for start in range(0, len(objs), self.__bulk_batch):
+            self.__session.add_all(objs[start:start + self.__bulk_batch])
+            self.__session.commit()
+
+    def bulk_upsert(self, cls, dicts, keep=()):
+        """creates a row of cls from each dictionary of dicts, or updates
+        the row of cls with its id with its attributes but those in keep,
+        committing __bulk_batch of them at a time after looking their ids
+        up in one query; returns (object, created) pairs in the order of
+        dicts. Every dictionary is checked before the first batch is
+        written, raising ValueError when one is not valid, and a batch
+        failing midway is rolled back"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        for dct in dicts:
+            if type(dct) is not dict or \
+                    type(dct.get("id", "")) not in (str, type(None)):
+                raise ValueError("not a dictionary with a string id")
+            for attr in dct:
+                if not settable(cls, attr):
+                    raise ValueError("cannot set {}".format(attr))
+        now = datetime.utcnow()
+        done = []
+        for start in range(0, len(dicts), self.__bulk_batch):
+            batch = dicts[start:start + self.__bulk_batch]
+            ids = [dct["id"] for dct in batch if dct.get("id") is not None]
+            stored = {}
+            if len(ids) > 0:
+                query = self.__session.query(cls).filter(cls.id.in_(ids))
+                stored = {obj.id: obj for obj in query}
+            try:
+                for dct in batch:
+                    obj = stored.get(dct.get("id"))
+                    if obj is None:
+                        obj = cls(**dct)
+                        self.__session.add(obj)
+                        stored[obj.id] = obj
+                        done.append((obj, True))
+                        continue
+                    for attr, value in dct.items():
+                        if attr not in fixed and attr not in keep:
+                            setattr(obj, attr, value)
+                    obj.updated_at = now
+                    done.append((obj, False))
+            except (AttributeError, TypeError, ValueError) as e:
+                self.__session.rollback()
+                raise ValueError("invalid {}: {}".format(cls.__name__, e)) \
+                    from e
+            self.__session.commit()
+        return done
+
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__forget(obj)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
+        self.__index()
+        try:
+            with self.__engine.begin() as conn:
+                counted = set(conn.execute(select(versions.c.name)).scalars())
+                missing = [{"name": name, "version": 0} for name in classes
+                           if name not in counted]
+                if len(missing) > 0:
+                    conn.execute(versions.insert(), missing)
+        except exc.IntegrityError:
+            # another process inserted them first
+            pass
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "after_flush", self.__flushed)
+        event.listen(sess_factory, "before_commit", self.__committing)
+        event.listen(sess_factory, "after_commit", self.__committed)
+        event.listen(sess_factory, "after_rollback", self.__rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        if self.__cache_size > 0 and self.__cache_path is not None:
+            self.__cache = SharedCache(self.__cache_path, self.__cache_size,
+                                       self.__cache_ttl)
+        elif self.__cache_size > 0:
+            self.__cache = ObjectCache(self.__cache_size, self.__cache_ttl)
+
+    def __index(self):
+        """creates the indexes of the models, FULLTEXT ones included, that
+        tables created before them lack: create_all() leaves the tables
+        it finds alone"""
+        inspector = sqlalchemy.inspect(self.__engine)
+        for table in Base.metadata.sorted_tables:
+            held = {index["name"] for index in
+                    inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in held:
+                    continue
+                try:
+                    index.create(self.__engine)
+                except (exc.OperationalError, exc.ProgrammingError):
+                    # another process created it first
+                    pass
 
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
+    def metrics(self):
+        """returns counters describing the storage and its connection
+        pool"""
+        metrics = {}
+        pool = self.__engine.pool
+        if isinstance(pool, MeteredPool):
+            metrics.update(("pool_" + name, value)
+                           for name, value in pool.stats().items())
+        if self.__cache is not None:
+            metrics.update(("cache_" + name, value)
+                           for name, value in self.__cache.stats().items())
+        return metrics
+
+    def get(self, cls, id, *, load=None):
         '''retrieves an object of type cls with the passed id
-        or none if not found'''
+        or none if not found, loading the relationships named in load.
+        Without load, the columns of the object are read from the cache
+        when it holds them, and stored in it otherwise'''
         obj = None
         if cls is not None and issubclass(cls, BaseModel):
-            obj = self.__session.query(cls).filter(cls.id == id).first()
+            if self.__cache is None or load or type(id) is not str:
+                return self.__session.get(cls, id,
+                                          options=self.__options(cls, load))
+            key = cls.__name__ + '.' + id
+            identity = self.__session.identity_key(cls, id)
+            if identity not in self.__session.identity_map:
+                values = self.__cache.get(key)
+                if values is not None:
+                    return self.__restore(cls, values)
+            obj = self.__session.get(cls, id)
+            if obj is not None and \
+                    key not in self.__session.info.get("written", {}):
+                self.__remember(obj)
+        return obj
+
+    def __columns(self, obj):
+        """returns the column values of obj as a query would load them, or
+        None when some of them are expired or hold changes not yet flushed;
+        columns never set are None"""
+        state = instance_state(obj)
+        if state.modified or not state.persistent or \
+                state.expired_attributes:
+            return None
+        return {attr.key: state.dict.get(attr.key)
+                for attr in state.mapper.column_attrs}
+
+    def __remember(self, obj):
+        """stores the column values of obj in the cache, or forgets obj
+        when they cannot be read without a query"""
+        values = self.__columns(obj)
+        if values is None:
+            self.__forget(obj)
+        else:
+            self.__cache.put(obj.__class__.__name__ + '.' + obj.id, values)
+
+    def __forget(self, obj):
+        """removes obj from the cache"""
+        if self.__cache is not None and type(obj.id) is str:
+            self.__cache.discard(obj.__class__.__name__ + '.' + obj.id)
+
+    def __restore(self, cls, values):
+        """returns an object of cls holding the cached column values,
+        attached to the session as if it had been queried: it is built
+        without __init__ or __setattr__, so a User password is not hashed
+        again, and its relationships load when first read"""
+        obj = manager_of_class(cls).new_instance()
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        self.__session.add(obj)
         return obj
 
+    def __flushed(self, session, context):
+        """notes the classes of the objects a flush writes, for the commit
+        to count them in versions, and the objects, so that the cache
+        follows them once they are committed, or forgets them if they are
+        rolled back"""
+        session.info.setdefault("touched", set()).update(
+            obj.__class__.__name__ for objs in
+            (session.new, session.dirty, session.deleted) for obj in objs)
+        if self.__cache is None:
+            return
+        written = session.info.setdefault("written", {})
+        for obj in session.new.union(session.dirty):
+            written[obj.__class__.__name__ + '.' + obj.id] = obj
+        for obj in session.deleted:
+            written[obj.__class__.__name__ + '.' + obj.id] = None
+
+    def __committing(self, session):
+        """flushes the pending changes then counts the classes the
+        transaction touched in versions, once each whatever the number of
+        flushes, in the same transaction"""
+        session.flush()
+        for name in sorted(session.info.pop("touched", ())):
+            session.connection().execute(
+                versions.update().where(versions.c.name == name).values(
+                    version=versions.c.version + 1))
+
+    def __committed(self, session):
+        """writes the committed objects through to the cache and removes
+        the deleted ones"""
+        for key, obj in session.info.pop("written", {}).items():
+            if obj is None or instance_state(obj).was_deleted:
+                self.__cache.discard(key)
+            else:
+                self.__remember(obj)
+
+    def __rolled_back(self, session):
+        """forgets the classes a rolled back flush touched and removes
+        from the cache the objects it wrote"""
+        session.info.pop("touched", None)
+        for key in session.info.pop("written", {}):
+            self.__cache.discard(key)
+
+    def __options(self, cls, load):
+        """returns the loader options of the relationships of cls named in
+        load, such as ("cities",) or ("cities.places",) for nested ones:
+        collections are loaded by a second SELECT ... IN query, and single
+        objects joined to the first one"""
+        options = []
+        for path in load or ():
+            option = None
+            owner = cls
+            for name in path.split('.'):
+                attr = getattr(owner, name)
+                loader = selectinload if attr.property.uselist \
+                    else joinedload
+                option = loader(attr) if option is None \
+                    else getattr(option, loader.__name__)(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def stream(self, cls, after=None, **criteria):
+        """yields the objects page() returns without a limit, fetching
+        them one keyset query of __stream_batch rows at a time"""
+        while True:
+            objs = self.page(cls, self.__stream_batch, after, **criteria)
+            yield from objs
+            if len(objs) < self.__stream_batch:
+                return
+            after = (objs[-1].created_at, objs[-1].id)
+
+    def search_places(self, city_ids=None, amenity_ids=None, ranges=None):
+        """returns the places in any of city_ids (in any city when None)
+        that have every amenity of amenity_ids and whose numeric columns
+        lie within ranges, {column: (low, high)} with None for an open
+        bound, keyed like all(), in one query grouping place_amenity by
+        place"""
+        query = self.__session.query(Place)
+        if city_ids is not None:
+            query = query.filter(Place.city_id.in_(set(city_ids)))
+        for attr, (low, high) in (ranges or {}).items():
+            if low is not None:
+                query = query.filter(getattr(Place, attr) >= low)
+            if high is not None:
+                query = query.filter(getattr(Place, attr) <= high)
+        if amenity_ids:
+            amenity_ids = set(amenity_ids)
+            place_amenity = Base.metadata.tables['place_amenity']
+            matching = self.__session.query(place_amenity.c.place_id).\
+                filter(place_amenity.c.amenity_id.in_(amenity_ids)).\
+                group_by(place_amenity.c.place_id).\
+                having(func.count(place_amenity.c.amenity_id) ==
+                       len(amenity_ids))
+            query = query.filter(Place.id.in_(matching))
+        return {'Place.' + obj.id: obj for obj in query}
+
+    def __located(self, cls, south, west, north, east):
+        """returns the query for the objects of cls in the box, a range on
+        the (latitude, longitude) index"""
+        query = self.__session.query(cls).filter(
+            cls.latitude.between(south, north))
+        if west > east:
+            return query.filter(or_(cls.longitude >= west,
+                                    cls.longitude <= east))
+        return query.filter(cls.longitude.between(west, east))
+
+    def within(self, cls, south, west, north, east):
+        """returns the objects of cls located in the box, keyed like all();
+        west > east means the box crosses the antimeridian"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__located(cls, south, west, north, east)
+        return {obj.__class__.__name__ + '.' + obj.id: obj for obj in query}
+
+    def near(self, cls, latitude, longitude, radius=None, k=None):
+        """returns (distance, object) pairs of the k objects of cls closest
+        to latitude, longitude and no farther than radius kilometers,
+        nearest first; radius and k may be None for no limit. Without a
+        radius, the box around the point grows until it holds k objects
+        within the distance it reaches"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        if k is not None and k <= 0:
+            return []
+        farthest = 180 * geo.KM_PER_DEGREE
+        reach = radius
+        if reach is None:
+            reach = geo.KM_PER_DEGREE if k is not None else farthest
+        while True:
+            query = self.__located(cls, *geo.box(latitude, longitude, reach))
+            found = []
+            for obj in query:
+                d = geo.distance(latitude, longitude,
+                                 obj.latitude, obj.longitude)
+                if d <= reach or reach >= farthest:
+                    found.append((d, obj.id, obj))
+            if radius is not None or reach >= farthest or len(found) >= k:
+                break
+            reach = min(4 * reach, farthest)
+        found.sort(key=lambda pair: pair[:2])
+        return [(d, obj) for d, _, obj in found[:k]]
+
+    def search(self, query, cls=None, limit=None, after=None):
+        """returns (score, object) pairs of up to limit objects of cls (of
+        every class of searchable when None) whose text matches query,
+        best first then by key, and coming after the (score, key) pair
+        after in that order. MySQL ranks them with MATCH ... AGAINST on
+        the FULLTEXT indexes; other databases, and MySQL tables missing
+        their index, select the rows holding a word of query and rank them
+        with BM25"""
+        names = list(searchable) if cls is None else \
+            [cls if isinstance(cls, str) else cls.__name__]
+        found = []
+        for name in names:
+            if name not in searchable:
+                continue
+            if self.__engine.dialect.name == 'mysql':
+                try:
+                    found.extend(self.__match(name, query, limit, after))
+                    continue
+                except exc.OperationalError as e:
+                    # 1191: the table has no FULLTEXT index on the columns
+                    if e.orig.args[0] != 1191:
+                        raise
+            found.extend(self.__rank(name, query))
+        found.sort(key=lambda hit: (-hit[0], hit[1]))
+        if after is not None:
+            score, key = after
+            found = [hit for hit in found if (-hit[0], hit[1]) > (-score, key)]
+        return [(score, obj) for score, key, obj in found[:limit]]
+
+    def __match(self, name, query, limit, after):
+        """returns (score, key, object) of the rows of the class name
+        matching query in natural language mode, best first"""
+        cls = classes[name]
+        score = match(*[getattr(cls, attr) for attr in searchable[name]],
+                      against=query)
+        rows = self.__session.query(cls, score).filter(score > 0)
+        if after is not None:
+            last, key = after
+            last_name, _, last_id = key.partition('.')
+            later = score < last
+            if name > last_name:
+                later = score <= last
+            elif name == last_name:
+                later = or_(score < last, and_(score == last,
+                                               cls.id > last_id))
+            rows = rows.filter(later)
+        rows = rows.order_by(score.desc(), cls.id).limit(limit)
+        return [(float(value), name + '.' + obj.id, obj)
+                for obj, value in rows]
+
+    def __rank(self, name, query):
+        """returns (score, key, object) of the rows of the class name
+        holding a word of query, ranked with BM25 against the number of
+        rows of the class"""
+        cls = classes[name]
+        columns = [getattr(cls, attr) for attr in searchable[name]]
+        words = set(tokenize(query))
+        if len(words) == 0:
+            return []
+        rows = self.__session.query(cls).filter(or_(
+            *[column.ilike('%' + w + '%') for column in columns
+              for w in words]))
+        texts = TextIndex()
+        objs = {}
+        for obj in rows:
+            key = name + '.' + obj.id
+            objs[key] = obj
+            texts.set(key, " ".join(getattr(obj, attr) or ""
+                                    for attr in searchable[name]))
+        total = self.__session.query(func.count(cls.id)).scalar()
+        return [(score, key, objs[key])
+                for score, key in texts.search(query, total)]
+
+    def __query(self, cls, criteria):
+        """returns the query for the objects of cls matching criteria"""
+        query = self.__session.query(cls)
+        for attr, value in criteria.items():
+            column = getattr(cls, attr)
+            if isinstance(value, (list, tuple, set)):
+                query = query.filter(column.in_(value))
+            else:
+                query = query.filter(column == value)
+        return query
+
+    def filter(self, cls, **criteria):
+        """returns the objects of cls whose columns equal the criteria,
+        keyed like all(); a list, tuple or set criterion matches any of its
+        values. The criteria become the WHERE clause of a single query"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__query(cls, criteria)
+        return {obj.__class__.__name__ + '.' + obj.id: obj for obj in query}
+
+    def page(self, cls, limit=None, after=None, **criteria):
+        """returns, as a list ordered by (created_at, id), up to limit
+        objects of cls coming after the (created_at, id) pair after and
+        matching the criteria as filter() does"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__query(cls, criteria)
+        if after is not None:
+            created_at, id = after
+            query = query.filter(or_(cls.created_at > created_at,
+                                     and_(cls.created_at == created_at,
+                                          cls.id > id)))
+        query = query.order_by(cls.created_at, cls.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def version(self, cls=None):
+        """returns the version of the rows of cls (of every class when
+        None), a string that changes whenever one of them is added, changed
+        or deleted, read from the counters kept in versions plus the
+        classes the open transaction touched, counted once it commits"""
+        query = self.__session.query(func.sum(versions.c.version))
+        names = set(classes) if cls is None else \
+            {cls if isinstance(cls, str) else cls.__name__}
+        if cls is not None:
+            query = query.filter(versions.c.name.in_(names))
+        version = query.scalar() or 0
+        touched = self.__session.info.get("touched", ())
+        return str(version + len(names.intersection(touched)))
+
     def count(self, cls=None):
         '''counts ho many objects of type cls in storage or
         counts all objects of all classes if cls is None'''
-        return len(self.all(cls))
+        counted = [classes[clss] for clss in classes
+                   if cls is None or cls is classes[clss] or cls == clss]
+        if len(counted) == 0:
+            return 0
+        counts = [self.__session.query(func.count(clss.id)).scalar_subquery()
+                  for clss in counted]
+        return sum(self.__session.query(*counts).one())
@@ -3,10 +3,25 @@
 Contains the FileStorage class
 """
 
+import atexit
+import bisect
+import copy
+from datetime import datetime
 import json
+import os
+from os import getenv
+import sys
+import threading
+import time
+import uuid
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, settable, to_dicts
 from models.city import City
+from models.engine import serializers
+from models.engine.columns import Columns
+from models.engine.geo import Grid
+from models.engine.rwlock import RWLock
+from models.engine.text import TextIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -14,6 +29,19 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes holding ids of other objects, indexed for reverse lookups
+relations = {"City": ("state_id",),
+             "Place": ("city_id", "user_id", "amenity_ids"),
+             "Review": ("place_id", "user_id")}
+# numeric attributes kept in columns for range filters
+columns = {"Place": ("number_rooms", "number_bathrooms", "max_guest",
+                     "price_by_night", "latitude", "longitude")}
+# classes whose latitude and longitude are kept in a Grid
+located = ("Place",)
+# attributes bulk_upsert() never updates
+fixed = ("id", "created_at", "updated_at", "__class__")
+# text attributes of each class indexed for search()
+searchable = {"Place": ("name", "description"), "Review": ("text",)}
 
 
 class FileStorage:
@@ -21,66 +49,771 @@ class FileStorage:
 
     # string - path to the JSON file
     __file_path = "file.json"
+    # string - serializer the snapshot is written with
+    __format = getenv("HBNB_FILE_FORMAT", "json")
+    # string - path to the journal of changes made since the last snapshot
+    __journal_path = "file.json.log"
+    # integer - journal records kept before compacting, 0 disables it
+    __journal_limit = int(getenv("HBNB_FILE_JOURNAL", "0") or 0)
+    # boolean - whether reloaded objects share one copy of each id string
+    __interning = getenv("HBNB_FILE_COMPACT") == "1"
+    # integer - records currently in the journal
+    __journaled = 0
+    # dictionary - keys changed since the last save, None once deleted
+    __dirty = {}
+    # tuple - signatures of the snapshot and journal files as this
+    # process last read or wrote them
+    __seen = (None, None)
+    # float - seconds a save waits for other saves to share its write
+    __commit_window = float(getenv("HBNB_FILE_COMMIT_WINDOW", "0") or 0) / 1000
+    # condition - guards the group commit counters below
+    __commit = threading.Condition()
+    # integer - save() calls made / covered by a finished write
+    __requested = 0
+    __written = 0
+    # boolean - whether a save is currently gathering or writing a group
+    __committing = False
+    # float - seconds saved changes may wait for the background flusher,
+    # 0 writes them synchronously in save()
+    __write_behind = float(getenv("HBNB_FILE_WRITE_BEHIND", "0") or 0) / 1000
+    # thread - the background flusher, started by the first save()
+    __flusher = None
+    # event - set to stop the background flusher
+    __stopping = threading.Event()
+    # lock - held while the flusher writes
+    __flushing = threading.Lock()
+    # boolean - whether saves are waiting for the flusher
+    __unflushed = False
+    # dictionary - counters about the flusher's writes
+    __flushes = {"flushes": 0, "flush_errors": 0, "last_flush_ms": 0.0,
+                 "max_flush_ms": 0.0, "last_error": None}
+    # RWLock - shared by reads, exclusive for changes and writes to disk
+    __lock = RWLock()
+    # lock - held while the indexes are rebuilt
+    __reindexing = threading.Lock()
+    # lock - held by the thread building a text index
+    __text_building = threading.Lock()
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects bucketed by <class name>
+    __by_class = {}
+    # dictionary - objects by (<class name>, <attribute>), then by value
+    __related = {}
+    # dictionary - the values each key is indexed by, one per attribute of
+    # relations[<class name>], as a tuple for list attributes
+    __related_keys = {}
+    # dictionary - the Columns of each class listed in columns
+    __columns = {}
+    # float - degrees of latitude and longitude a cell of the grids spans
+    __geo_cell = float(getenv("HBNB_FILE_GEO_CELL", "0.25") or 0.25)
+    # dictionary - the Grid of each class listed in located
+    __grids = {}
+    # dictionary - the TextIndex of a class listed in searchable, built
+    # without holding the lock the first time it is searched
+    __texts = {}
+    # dictionary - keys added, changed or removed while the TextIndex of
+    # a class is being built, by <class name>
+    __text_changes = {}
+    # dictionary - the sorted (created_at, id) pairs of a class, built
+    # the first time a page of it is asked for
+    __ordered = {}
+    # dictionary - the (created_at, id) pair each key is ordered by
+    __order_keys = {}
+    # integer - objects stream() takes from a class per batch
+    __stream_batch = 1000
+    # the __objects dictionary the indexes were built from
+    __indexed = None
+    # dictionary - objects added, changed or removed, by <class name>
+    __versions = {}
+    # string - tells the versions apart from those counted by another
+    # process or before __objects was replaced
+    __epoch = uuid.uuid4().hex[:8]
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def __buckets(self):
+        """returns the per-class buckets, rebuilt if __objects was replaced"""
+        if FileStorage.__indexed is not self.__objects:
+            with self.__reindexing:
+                if FileStorage.__indexed is not self.__objects:
+                    FileStorage.__by_class = {}
+                    FileStorage.__related = {}
+                    FileStorage.__related_keys = {}
+                    FileStorage.__columns = {name: Columns(fields) for
+                                             name, fields in columns.items()}
+                    FileStorage.__grids = {name: Grid(self.__geo_cell)
+                                           for name in located}
+                    FileStorage.__texts = {}
+                    FileStorage.__text_changes = {}
+                    FileStorage.__ordered = {}
+                    FileStorage.__order_keys = {}
+                    FileStorage.__versions = {}
+                    FileStorage.__epoch = uuid.uuid4().hex[:8]
+                    for key, obj in self.__objects.items():
+                        self.__index(key, obj)
+                    FileStorage.__indexed = self.__objects
+        return self.__by_class
+
+    def __class_name(self, cls):
+        """returns the bucket name of cls, given as a class or a string"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __index(self, key, obj):
+        """adds obj to its class bucket and to the reverse indexes"""
+        name = key.split('.', 1)[0]
+        self.__by_class.setdefault(name, {})[key] = obj
+        self.__unindex_related(name, key)
+        attrs = relations.get(name, ())
+        if len(attrs) > 0:
+            held = []
+            for attr in attrs:
+                values = getattr(obj, attr, None)
+                if isinstance(values, list):
+                    values = tuple(values)
+                held.append(values)
+                index = self.__related.setdefault((name, attr), {})
+                for value in values if isinstance(values, tuple) \
+                        else (values,):
+                    if isinstance(value, str):
+                        index.setdefault(value, {})[key] = obj
+            self.__related_keys[key] = tuple(held)
+        if name in self.__columns:
+            self.__columns[name].set(key, obj)
+        if name in self.__grids:
+            self.__grids[name].set(key, getattr(obj, "latitude", None),
+                                   getattr(obj, "longitude", None))
+        if name in self.__texts:
+            self.__texts[name].set(key, self.__text(name, obj))
+        if name in self.__text_changes:
+            self.__text_changes[name].add(key)
+        ordered = self.__ordered.get(name)
+        if ordered is not None:
+            self.__unorder(ordered, key)
+            order_key = (obj.created_at, obj.id)
+            bisect.insort(ordered, order_key)
+            self.__order_keys[key] = order_key
+
+    def __unindex_related(self, name, key):
+        """removes key from the reverse indexes it was added to"""
+        held = self.__related_keys.pop(key, ())
+        for attr, values in zip(relations.get(name, ()), held):
+            index = self.__related[(name, attr)]
+            for value in values if isinstance(values, tuple) else (values,):
+                if isinstance(value, str) and value in index:
+                    index[value].pop(key, None)
+                    if len(index[value]) == 0:
+                        del index[value]
+
+    def __unorder(self, ordered, key):
+        """removes key from the sorted pairs of its class"""
+        order_key = self.__order_keys.pop(key, None)
+        if order_key is not None:
+            i = bisect.bisect_left(ordered, order_key)
+            if i < len(ordered) and ordered[i] == order_key:
+                del ordered[i]
+
+    def __ordering(self, name):
+        """returns the sorted (created_at, id) pairs of the class name"""
+        ordered = self.__ordered.get(name)
+        if ordered is None:
+            with self.__reindexing:
+                ordered = self.__ordered.get(name)
+                if ordered is None:
+                    ordered = []
+                    for key, obj in self.__by_class.get(name, {}).items():
+                        self.__order_keys[key] = (obj.created_at, obj.id)
+                        ordered.append(self.__order_keys[key])
+                    ordered.sort()
+                    self.__ordered[name] = ordered
+        return ordered
+
+    def __text(self, name, obj):
+        """returns the searchable text of obj, an object of the class name"""
+        return " ".join(value for value in (getattr(obj, attr, None) for
+                                            attr in searchable[name])
+                        if isinstance(value, str))
+
+    def __text_index(self, name):
+        """builds the TextIndex of the class name when it is missing: the
+        objects are listed, and the index swapped in with the changes made
+        meanwhile, under the write lock, but tokenized without holding
+        it; the caller must not hold the lock"""
+        if name in self.__texts:
+            return
+        with self.__text_building:
+            with self.__lock.writing():
+                self.__buckets()
+                if name in self.__texts:
+                    return
+                indexed = self.__indexed
+                self.__text_changes[name] = set()
+                objs = list(self.__by_class.get(name, {}).items())
+            texts = TextIndex()
+            try:
+                for key, obj in objs:
+                    texts.set(key, self.__text(name, obj))
+            except BaseException:
+                with self.__lock.writing():
+                    self.__text_changes.pop(name, None)
+                raise
+            with self.__lock.writing():
+                changed = self.__text_changes.pop(name, ())
+                if FileStorage.__indexed is not indexed:
+                    return
+                bucket = self.__by_class.get(name, {})
+                for key in changed:
+                    if key in bucket:
+                        texts.set(key, self.__text(name, bucket[key]))
+                    else:
+                        texts.remove(key)
+                self.__texts[name] = texts
+
+    def __add(self, key, obj):
+        """stores obj under key in __objects and in the indexes"""
+        self.__buckets()
+        self.__objects[key] = obj
+        self.__index(key, obj)
+        self.__bump(key)
+
+    def __bump(self, key):
+        """counts a change to the class of key in __versions"""
+        name = key.split('.', 1)[0]
+        self.__versions[name] = self.__versions.get(name, 0) + 1
+
+    def __remove(self, key):
+        """drops key from __objects and from the indexes"""
+        if key in self.__objects:
+            name = key.split('.', 1)[0]
+            self.__buckets().get(name, {}).pop(key, None)
+            self.__unindex_related(name, key)
+            if name in self.__ordered:
+                self.__unorder(self.__ordered[name], key)
+            if name in self.__columns:
+                self.__columns[name].remove(key)
+            if name in self.__grids:
+                self.__grids[name].remove(key)
+            if name in self.__texts:
+                self.__texts[name].remove(key)
+            if name in self.__text_changes:
+                self.__text_changes[name].add(key)
+            del self.__objects[key]
+            self.__bump(key)
+
+    def all(self, cls=None, *, load=None):
+        """returns the dictionary __objects; load is the loading hint
+        DBStorage takes, relations are read from the indexes here"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = self.__class_name(cls)
+            with self.__lock.reading():
+                return dict(self.__buckets().get(name, {}))
         return self.__objects
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.writing():
+                self.__add(key, obj)
+                self.__dirty[key] = obj
+
+    def bulk_new(self, objs):
+        """sets in __objects every object of objs, as new() does, and
+        saves them all with a single write"""
+        with self.__lock.writing():
+            for obj in objs:
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__add(key, obj)
+                self.__dirty[key] = obj
+        self.save()
+
+    def bulk_upsert(self, cls, dicts, keep=()):
+        """creates an object of cls from each dictionary of dicts, or
+        updates the object of cls stored under its id with its attributes
+        but those in keep, then saves them all with a single write;
+        returns (object, created) pairs in the order of dicts. The new
+        objects are built, and the updates made on copies, before anything
+        is stored, so a ValueError leaves the storage untouched"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        name = cls.__name__
+        for dct in dicts:
+            if type(dct) is not dict or \
+                    type(dct.get("id", "")) not in (str, type(None)):
+                raise ValueError("not a dictionary with a string id")
+            for attr in dct:
+                if not settable(cls, attr):
+                    raise ValueError("cannot set {}".format(attr))
+        now = datetime.utcnow()
+        done = []
+        with self.__lock.writing():
+            bucket = self.__buckets().get(name, {})
+            built = {}
+            staged = {}
+            for dct in dicts:
+                key = "{}.{}".format(name, dct.get("id"))
+                obj = bucket.get(key) or built.get(key)
+                try:
+                    if obj is None:
+                        obj = cls(**dct)
+                        built[name + "." + obj.id] = obj
+                        done.append((obj, True))
+                        continue
+                    draft = staged.get(key) or copy.copy(obj)
+                    for attr, value in dct.items():
+                        if attr not in fixed and attr not in keep:
+                            setattr(draft, attr, value)
+                except (AttributeError, TypeError, ValueError) as e:
+                    raise ValueError("invalid {}: {}".format(key, e)) from e
+                staged[key] = draft
+                done.append((obj, False))
+            for key, draft in staged.items():
+                obj = bucket.get(key) or built[key]
+                obj.__dict__.update(draft.__dict__)
+                obj.updated_at = now
+            for obj, created in done:
+                key = name + "." + obj.id
+                self.__add(key, obj)
+                self.__dirty[key] = obj
+        self.save()
+        return done
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path), or
+        appends the pending changes to the journal when it is enabled;
+        saves made within the commit window share a single write, and in
+        write-behind mode the background flusher writes them later"""
+        if self.__write_behind > 0:
+            FileStorage.__unflushed = True
+            self.__start_flusher()
+            return
+        if self.__commit_window <= 0:
+            self.__write()
+            return
+        with self.__commit:
+            FileStorage.__requested += 1
+            ticket = self.__requested
+            while self.__committing and self.__written < ticket:
+                self.__commit.wait()
+            if self.__written >= ticket:
+                return
+            FileStorage.__committing = True
+        try:
+            time.sleep(self.__commit_window)
+            with self.__commit:
+                covered = self.__requested
+            self.__write()
+            with self.__commit:
+                FileStorage.__written = covered
+        finally:
+            with self.__commit:
+                FileStorage.__committing = False
+                self.__commit.notify_all()
+
+    def __start_flusher(self):
+        """starts the background flusher unless it is already running"""
+        with self.__commit:
+            if self.__flusher is not None and self.__flusher.is_alive():
+                return
+            FileStorage.__stopping.clear()
+            FileStorage.__flusher = threading.Thread(
+                target=self.__flush_loop, name="FileStorage flusher",
+                daemon=True)
+            self.__flusher.start()
+            atexit.register(self.stop_flusher)
+
+    def __flush_loop(self):
+        """flushes every __write_behind seconds until asked to stop"""
+        while not self.__stopping.wait(self.__write_behind):
+            try:
+                self.flush()
+            except Exception:
+                # counted in __flushes, retried on the next tick
+                pass
+
+    def flush(self):
+        """writes the changes saves left to the background flusher"""
+        with self.__flushing:
+            if not self.__unflushed:
+                return
+            FileStorage.__unflushed = False
+            start = time.perf_counter()
+            try:
+                self.__write()
+            except Exception as e:
+                FileStorage.__unflushed = True
+                self.__flushes["flush_errors"] += 1
+                self.__flushes["last_error"] = repr(e)
+                raise
+            took = (time.perf_counter() - start) * 1000
+            self.__flushes["flushes"] += 1
+            self.__flushes["last_flush_ms"] = took
+            if took > self.__flushes["max_flush_ms"]:
+                self.__flushes["max_flush_ms"] = took
+
+    def stop_flusher(self):
+        """stops the background flusher after a last flush"""
+        self.__stopping.set()
+        if self.__flusher is not None:
+            self.__flusher.join()
+        self.flush()
+
+    def metrics(self):
+        """returns counters describing the storage and its pending writes"""
+        with self.__lock.reading():
+            result = {"objects": len(self.__objects),
+                      "pending_changes": len(self.__dirty),
+                      "unflushed": self.__unflushed}
+            result.update(self.__flushes)
+        return result
+
+    def __write(self):
+        """writes the pending changes to the journal or a new snapshot"""
+        with self.__lock.writing():
+            if self.__journal_limit > 0 and \
+               self.__journaled + len(self.__dirty) <= self.__journal_limit:
+                self.__append_journal()
+            else:
+                self.__compact()
+
+    def compact(self):
+        """writes every object to the snapshot file and empties the
+        journal"""
+        with self.__lock.writing():
+            self.__compact()
+
+    def __compact(self):
+        """writes the snapshot file; the caller holds the write lock"""
+        serializers.write(self.__file_path, serializers.get(self.__format),
+                          zip(self.__objects.keys(),
+                              to_dicts(self.__objects.values())))
+        try:
+            os.remove(self.__journal_path)
+        except FileNotFoundError:
+            pass
+        FileStorage.__journaled = 0
+        self.__dirty.clear()
+        self.__mark_seen()
+
+    def __append_journal(self):
+        """appends one line per changed key to the journal, holding the
+        object's dictionary or null when it was deleted"""
+        with open(self.__journal_path, 'a') as f:
+            for key, obj in self.__dirty.items():
+                value = obj.to_dict() if obj is not None else None
+                f.write(json.dumps({"key": key, "value": value}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        FileStorage.__journaled += len(self.__dirty)
+        self.__dirty.clear()
+        self.__mark_seen()
+
+    def __signature(self, path):
+        """returns what identifies the current content of path, or None"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def __mark_seen(self):
+        """records the files as being the ones this process knows"""
+        FileStorage.__seen = (self.__signature(self.__file_path),
+                              self.__signature(self.__journal_path))
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the snapshot file to __objects one object at a
+        time, whatever format it was written in, then replays the journal
+        on top of it"""
+        with self.__lock.writing():
+            self.__reload(repair=True)
+
+    def __reload(self, repair=False):
+        """reads the snapshot and journal; the caller holds the write lock"""
+        try:
+            f = open(self.__file_path, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            with f:
+                serializer = serializers.detect(f, self.__format)
+                for key, value in serializer.load(f):
+                    self.__add(key, self.__load(value))
+        FileStorage.__journaled = 0
+        self.__replay_journal(0, repair)
+
+    def __load(self, value):
+        """returns the object a snapshot or journal dictionary holds"""
+        if self.__interning:
+            self.__intern(value)
+        return classes[value["__class__"]]._from_storage(value)
+
+    def __intern(self, value):
+        """replaces the id and the ids of related objects in value by their
+        interned copies, so that a City id is held once however many
+        places point to it"""
+        for attr in ("id",) + relations.get(value["__class__"], ()):
+            held = value.get(attr)
+            if isinstance(held, str):
+                value[attr] = sys.intern(held)
+            elif isinstance(held, list):
+                value[attr] = [sys.intern(item) if isinstance(item, str)
+                               else item for item in held]
+
+    def __replay_journal(self, offset, repair):
+        """applies the journal records written from byte offset on, in the
+        order they were written; an incomplete last record is cut off when
+        repair is set, and left for the next replay otherwise"""
+        journal = None
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
+            with open(self.__journal_path, 'rb+') as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        record = json.loads(line)
+                    except ValueError:
+                        if repair:
+                            # a torn record left by an interrupted append
+                            f.truncate(offset)
+                        break
+                    key, value = record["key"], record["value"]
+                    if value is None:
+                        self.__remove(key)
+                    else:
+                        self.__add(key, self.__load(value))
+                    offset += len(line)
+                    FileStorage.__journaled += 1
+                st = os.fstat(f.fileno())
+                journal = (st.st_ino, offset, st.st_mtime_ns)
+        except FileNotFoundError:
             pass
+        FileStorage.__seen = (self.__signature(self.__file_path), journal)
 
     def delete(self, obj=None):
         """delete obj from __objects if its inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock.writing():
+                if key in self.__objects:
+                    self.__remove(key)
+                    self.__dirty[key] = None
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """reloads what another process changed on disk since this one last
+        read or wrote the files: only the new journal records when the
+        journal merely grew, everything otherwise; nothing is reloaded
+        while saved changes are still waiting for the flusher"""
+        if self.__unflushed or self.__flushing.locked():
+            return
+        if self.__seen == (self.__signature(self.__file_path),
+                           self.__signature(self.__journal_path)):
+            return
+        with self.__lock.writing():
+            snapshot, journal = self.__seen
+            current = self.__signature(self.__journal_path)
+            if (snapshot, journal) == (self.__signature(self.__file_path),
+                                       current):
+                return
+            if snapshot != self.__signature(self.__file_path) or \
+               current is None:
+                self.__reload()
+            elif journal is None:
+                self.__replay_journal(0, False)
+            elif current[0] == journal[0] and current[1] >= journal[1]:
+                self.__replay_journal(journal[1], False)
+            else:
+                self.__reload()
 
-    def get(self, cls, id):
+    def get(self, cls, id, *, load=None):
         '''retrieves an object of type cls with the passed id
-        or none if not found'''
+        or none if not found; load is ignored like in all()'''
         if cls is None:
             return None
-        objs = self.all(cls)
-        for obj in objs.values():
-            if obj.id == id:
-                return obj
-        return None
+        name = self.__class_name(cls)
+        key = "{}.{}".format(name, id)
+        with self.__lock.reading():
+            return self.__buckets().get(name, {}).get(key)
 
     def count(self, cls=None):
         '''counts ho many objects of type cls in storage or
         counts all objects of all classes if cls is None'''
-        return len(self.all(cls))
+        if cls is None:
+            return len(self.__objects)
+        with self.__lock.reading():
+            return len(self.__buckets().get(self.__class_name(cls), {}))
+
+    def version(self, cls=None):
+        """returns the version of the objects of cls (of every class when
+        None), a string that changes whenever one of them is added, changed
+        or deleted"""
+        with self.__lock.reading():
+            self.__buckets()
+            if cls is None:
+                changes = sum(self.__versions.values())
+            else:
+                changes = self.__versions.get(self.__class_name(cls), 0)
+            return "{}.{}".format(self.__epoch, changes)
+
+    def filter(self, cls, **criteria):
+        """returns the objects of cls whose attributes equal the criteria,
+        keyed like all(); a list, tuple or set criterion matches any of its
+        values, and a list attribute such as amenity_ids matches when it
+        contains the value. Ids and indexed attributes are looked up, not
+        scanned"""
+        name = self.__class_name(cls)
+        options = {}
+        for attr, value in criteria.items():
+            values = value if isinstance(value, (list, tuple, set)) \
+                else [value]
+            try:
+                options[attr] = set(values)
+            except TypeError:
+                # unhashable values are compared one by one
+                options[attr] = list(values)
+        with self.__lock.reading():
+            candidates = self.__buckets().get(name, {})
+            if "id" in options:
+                bucket = candidates
+                candidates = {}
+                for value in options["id"]:
+                    key = "{}.{}".format(name, value)
+                    if isinstance(value, str) and key in bucket:
+                        candidates[key] = bucket[key]
+            else:
+                for attr in options:
+                    if attr in relations.get(name, ()) and \
+                            isinstance(options[attr], set):
+                        index = self.__related.get((name, attr), {})
+                        candidates = {}
+                        for value in options[attr]:
+                            candidates.update(index.get(value, {}))
+                        break
+            return {key: obj for key, obj in candidates.items()
+                    if self.__matches(obj, options)}
+
+    def page(self, cls, limit=None, after=None, **criteria):
+        """returns, as a list ordered by (created_at, id), up to limit
+        objects of cls coming after the (created_at, id) pair after and
+        matching the criteria as filter() does"""
+        if len(criteria) > 0:
+            objs = sorted(self.filter(cls, **criteria).values(),
+                          key=lambda obj: (obj.created_at, obj.id))
+            if after is not None:
+                after = tuple(after)
+                objs = [obj for obj in objs
+                        if (obj.created_at, obj.id) > after]
+            return objs if limit is None else objs[:limit]
+        name = self.__class_name(cls)
+        with self.__lock.reading():
+            bucket = self.__buckets().get(name, {})
+            ordered = self.__ordering(name)
+            start = 0
+            if after is not None:
+                start = bisect.bisect_right(ordered, tuple(after))
+            stop = len(ordered) if limit is None else start + limit
+            return [bucket[name + "." + id] for _, id in ordered[start:stop]]
+
+    def stream(self, cls, after=None, **criteria):
+        """yields the objects page() returns without a limit, holding the
+        lock for one batch of them at a time"""
+        if len(criteria) > 0:
+            yield from self.page(cls, None, after, **criteria)
+            return
+        while True:
+            objs = self.page(cls, self.__stream_batch, after)
+            yield from objs
+            if len(objs) < self.__stream_batch:
+                return
+            after = (objs[-1].created_at, objs[-1].id)
+
+    def search_places(self, city_ids=None, amenity_ids=None, ranges=None):
+        """returns the places in any of city_ids (in any city when None)
+        that have every amenity of amenity_ids and whose numeric attributes
+        lie within ranges, {attribute: (low, high)} with None for an open
+        bound, keyed like all(). The city and amenity indexes each give a
+        group of places and the groups are intersected. The ranges are
+        selected over the whole columns when numpy can do it or nothing
+        else narrows the search, and checked on the remaining places
+        otherwise"""
+        with self.__lock.reading():
+            bucket = self.__buckets().get("Place", {})
+            cols = self.__columns["Place"]
+            groups = []
+            if city_ids is not None:
+                index = self.__related.get(("Place", "city_id"), {})
+                places = {}
+                for city_id in set(city_ids):
+                    places.update(index.get(city_id, {}))
+                groups.append(places)
+            index = self.__related.get(("Place", "amenity_ids"), {})
+            for amenity_id in set(amenity_ids or ()):
+                groups.append(index.get(amenity_id, {}))
+            if ranges and (cols.vectorized or len(groups) == 0):
+                groups.append({key: bucket[key]
+                               for key in cols.select(ranges)})
+                ranges = None
+            if len(groups) == 0:
+                return dict(bucket)
+            groups.sort(key=len)
+            return {key: obj for key, obj in groups[0].items()
+                    if all(key in group for group in groups[1:]) and
+                    (not ranges or cols.matches(key, ranges))}
+
+    def near(self, cls, latitude, longitude, radius=None, k=None):
+        """returns (distance, object) pairs of the k objects of cls closest
+        to latitude, longitude and no farther than radius kilometers,
+        nearest first; radius and k may be None for no limit"""
+        name = self.__class_name(cls)
+        with self.__lock.reading():
+            bucket = self.__buckets().get(name, {})
+            grid = self.__grids.get(name)
+            if grid is None:
+                return []
+            return [(d, bucket[key]) for d, key in
+                    grid.near(latitude, longitude, radius, k)]
+
+    def within(self, cls, south, west, north, east):
+        """returns the objects of cls located in the box, keyed like all();
+        west > east means the box crosses the antimeridian"""
+        name = self.__class_name(cls)
+        with self.__lock.reading():
+            bucket = self.__buckets().get(name, {})
+            grid = self.__grids.get(name)
+            if grid is None:
+                return {}
+            return {key: bucket[key]
+                    for key in grid.within(south, west, north, east)}
+
+    def search(self, query, cls=None, limit=None, after=None):
+        """returns (score, object) pairs of up to limit objects of cls (of
+        every class of searchable when None) whose text holds a word of
+        query, ranked with BM25, best first then by key, and coming after
+        the (score, key) pair after in that order"""
+        names = list(searchable) if cls is None else \
+            [name for name in [self.__class_name(cls)] if name in searchable]
+        found = None
+        while found is None:
+            for name in names:
+                self.__text_index(name)
+            with self.__lock.reading():
+                buckets = self.__buckets()
+                # the indexes are gone again when __objects was replaced
+                if all(name in self.__texts for name in names):
+                    found = [(score, key, buckets[name][key])
+                             for name in names for score, key
+                             in self.__texts[name].search(query)]
+        found.sort(key=lambda hit: (-hit[0], hit[1]))
+        if after is not None:
+            score, key = after
+            found = [hit for hit in found if (-hit[0], hit[1]) > (-score, key)]
+        return [(score, obj) for score, key, obj in found[:limit]]
+
+    def __matches(self, obj, options):
+        """tells whether obj holds one of the options of every attribute"""
+        for attr, values in options.items():
+            held = getattr(obj, attr, None)
+            if isinstance(held, list):
+                if not any(value in held for value in values):
+                    return False
+            elif held not in values:
+                return False
+        return True
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+"""
+Contains the Grid class and the distance helpers of the geographic search
+"""
+
+import heapq
+import math
+
+# float - mean radius of the Earth, in kilometers
+EARTH_RADIUS = 6371.0088
+# float - kilometers in a degree of latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """returns the great-circle distance in kilometers between two points
+    given in degrees"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def box(lat, lng, radius):
+    """returns the (south, west, north, east) box holding every point
+    within radius kilometers of lat, lng; west > east when it crosses the
+    antimeridian"""
+    south = max(-90.0, lat - radius / KM_PER_DEGREE)
+    north = min(90.0, lat + radius / KM_PER_DEGREE)
+    widest = math.cos(math.radians(max(abs(south), abs(north))))
+    if widest * 180 * KM_PER_DEGREE <= radius:
+        return south, -180.0, north, 180.0
+    spread = radius / (KM_PER_DEGREE * widest)
+    west = (lng - spread + 180) % 360 - 180
+    east = (lng + spread + 180) % 360 - 180
+    return south, west, north, east
+
+
+def position(lat, lng):
+    """returns (lat, lng) as floats when they are a valid position, None
+    otherwise; a longitude of 180 is returned as -180, the same meridian"""
+    for value in (lat, lng):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    if lng == 180:
+        lng = -180
+    return float(lat), float(lng)
+
+
+class Grid:
+    """indexes points by the cell of a regular latitude/longitude grid they
+    fall in, so that box and nearest point searches only look at the
+    cells around them"""
+
+    def __init__(self, cell=0.25):
+        """initializes an empty grid of cell degrees wide cells"""
+        self.cell = float(cell)
+        self.__rows = int(math.ceil(180 / self.cell)) + 1
+        self.__cols = int(math.ceil(360 / self.cell))
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """returns the number of points"""
+        return len(self.__points)
+
+    def __cell(self, lat, lng):
+        """returns the (row, column) of the cell holding lat, lng"""
+        return (int((lat + 90) // self.cell),
+                int((lng + 180) // self.cell) % self.__cols)
+
+    def set(self, key, lat, lng):
+        """moves key to lat, lng, or drops it when that is not a position"""
+        self.remove(key)
+        point = position(lat, lng)
+        if point is None:
+            return
+        cell = self.__cell(*point)
+        self.__cells.setdefault(cell, {})[key] = point
+        self.__points[key] = (point, cell)
+
+    def remove(self, key):
+        """drops key from the grid"""
+        held = self.__points.pop(key, None)
+        if held is not None:
+            points = self.__cells[held[1]]
+            del points[key]
+            if len(points) == 0:
+                del self.__cells[held[1]]
+
+    def within(self, south, west, north, east):
+        """returns the keys of the points in the box; west > east means
+        the box crosses the antimeridian"""
+        if west > east:
+            return self.__within(south, west, north, 180.0) + \
+                self.__within(south, -180.0, north, east)
+        if east >= 180 and west > -180:
+            # points on the antimeridian are held at -180
+            return self.within(south, west, north, -180.0)
+        return self.__within(south, west, north, east)
+
+    def __within(self, south, west, north, east):
+        """returns the keys of the points in a box that does not cross
+        the antimeridian"""
+        first, left = self.__cell(max(south, -90.0), west)
+        last, right = self.__cell(min(north, 90.0), min(east, 179.999999))
+        if (last - first + 1) * (right - left + 1) > len(self.__cells):
+            cells = [points for (row, col), points in self.__cells.items()
+                     if first <= row <= last and left <= col <= right]
+        else:
+            cells = [self.__cells[(row, col)]
+                     for row in range(first, last + 1)
+                     for col in range(left, right + 1)
+                     if (row, col) in self.__cells]
+        return [key for points in cells
+                for key, (lat, lng) in points.items()
+                if south <= lat <= north and west <= lng <= east]
+
+    def __ring(self, row, col, r):
+        """yields the cells r cells away from the cell row, col"""
+        for i in range(max(0, row - r), min(self.__rows - 1, row + r) + 1):
+            if r == 0:
+                cols = (col,)
+            elif i == row - r or i == row + r:
+                cols = range(col - r, col + r + 1)
+            else:
+                cols = (col - r, col + r)
+            for j in cols:
+                points = self.__cells.get((i, j % self.__cols))
+                if points is not None:
+                    yield points
+
+    def __bound(self, lat, lng, row, col, r):
+        """returns a distance in kilometers no point outside the first r
+        rings around the cell row, col, holding lat, lng, can be closer
+        than: the gap to the rows left out, or the distance across to the
+        nearest meridian of the columns left out"""
+        if r == 0:
+            return 0.0
+        gaps = [float("inf")]
+        if row - r + 1 > 0:
+            gaps.append(lat - ((row - r + 1) * self.cell - 90))
+        if row + r < self.__rows:
+            gaps.append((row + r) * self.cell - 90 - lat)
+        spread = min(lng - ((col - r + 1) * self.cell - 180),
+                     (col + r) * self.cell - 180 - lng, 90.0)
+        across = EARTH_RADIUS * math.asin(min(1.0, math.cos(
+            math.radians(lat)) * math.sin(math.radians(spread))))
+        return min(min(gaps) * KM_PER_DEGREE, across)
+
+    def near(self, lat, lng, radius=None, k=None):
+        """returns (distance, key) pairs of the k points closest to lat,
+        lng, no farther than radius kilometers, nearest first; radius and
+        k may be None for no limit"""
+        found = []
+        if k is not None and k <= 0:
+            return found
+        if radius is None and (k is None or k >= len(self.__points)):
+            pairs = ((distance(lat, lng, *point), key)
+                     for key, (point, cell) in self.__points.items())
+            return sorted(pairs)[:k]
+        row, col = self.__cell(lat, lng)
+        r = 0
+        while True:
+            bound = self.__bound(lat, lng, row, col, r)
+            if radius is not None and bound > radius:
+                break
+            if k is not None and len(found) == k and bound > -found[0][0]:
+                break
+            if 2 * r + 1 >= self.__cols:
+                # the rings wrap around the globe: look at what is left
+                done = {key for d, key in found}
+                cells = [{key: point for key, (point, cell)
+                          in self.__points.items() if key not in done}]
+            else:
+                cells = self.__ring(row, col, r)
+            for points in cells:
+                for key, point in points.items():
+                    d = distance(lat, lng, *point)
+                    if radius is not None and d > radius:
+                        continue
+                    if k is None or len(found) < k:
+                        heapq.heappush(found, (-d, key))
+                    elif d < -found[0][0]:
+                        heapq.heapreplace(found, (-d, key))
+            if 2 * r + 1 >= self.__cols:
+                break
+            r += 1
+        return sorted((-d, key) for d, key in found)
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Contains the MeteredPool class
+"""
+
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class MeteredPool(QueuePool):
+    """QueuePool counting its checkouts, the time they spend waiting for
+    a connection and the ones that give up after the pool timeout"""
+
+    def __init__(self, *args, **kwargs):
+        """initializes the pool and zeroes its counters"""
+        super().__init__(*args, **kwargs)
+        self.__counting = threading.Lock()
+        self.__getting = threading.local()
+        self.__checkouts = 0
+        self.__timeouts = 0
+        self.__waited = 0.0
+        self.__longest = 0.0
+
+    def _do_get(self):
+        """takes a connection from the queue, timing how long it takes;
+        QueuePool retries by calling _do_get() again, which is not counted
+        as another checkout"""
+        if getattr(self.__getting, "active", False):
+            return super()._do_get()
+        self.__getting.active = True
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.__counting:
+                self.__timeouts += 1
+            raise
+        finally:
+            self.__getting.active = False
+            waited = time.perf_counter() - start
+            with self.__counting:
+                self.__checkouts += 1
+                self.__waited += waited
+                self.__longest = max(self.__longest, waited)
+
+    def stats(self):
+        """returns the state of the pool and its counters"""
+        with self.__counting:
+            return {"size": self.size(),
+                    "checked_in": self.checkedin(),
+                    "checked_out": self.checkedout(),
+                    "overflow": max(0, self.overflow()),
+                    "checkouts": self.__checkouts,
+                    "timeouts": self.__timeouts,
+                    "wait_ms": round(self.__waited * 1000, 3),
+                    "max_wait_ms": round(self.__longest * 1000, 3)}
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class RWLock:
+    """lets many threads read at once, or a single thread write; waiting
+    writers go before new readers so that they are not starved"""
+
+    def __init__(self):
+        """initializes an unlocked RWLock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+
+    @contextmanager
+    def reading(self):
+        """holds the lock shared for the duration of the with block; a
+        thread already reading or writing gets in straight away"""
+        me = threading.get_ident()
+        reads = getattr(self.__local, "reads", 0)
+        if self.__writer == me or reads > 0:
+            self.__local.reads = reads + 1
+            try:
+                yield
+            finally:
+                self.__local.reads -= 1
+            return
+        with self.__cond:
+            while self.__writer is not None or self.__waiting > 0:
+                self.__cond.wait()
+            self.__readers += 1
+        self.__local.reads = 1
+        try:
+            yield
+        finally:
+            self.__local.reads = 0
+            with self.__cond:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """holds the lock exclusively for the duration of the with block"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer != me:
+                if getattr(self.__local, "reads", 0) > 0:
+                    raise RuntimeError("cannot upgrade a read lock")
+                self.__waiting += 1
+                try:
+                    while self.__writer is not None or self.__readers > 0:
+                        self.__cond.wait()
+                except BaseException:
+                    self.__waiting -= 1
+                    self.__cond.notify_all()
+                    raise
+                self.__waiting -= 1
+                self.__writer = me
+            self.__depth += 1
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    self.__writer = None
+                    self.__cond.notify_all()
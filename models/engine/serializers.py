@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+"""
+Contains the serializers FileStorage can write its snapshot with
+"""
+
+import io
+import json
+import os
+import stat
+import struct
+import tempfile
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# bytes - starts the header line of every non JSON snapshot
+MAGIC = b"HBNB1 "
+decoder = json.JSONDecoder()
+
+
+def iter_snapshot(f, chunk=1 << 16):
+    """yields the (key, dictionary) pairs of the JSON object in the file f
+    one at a time, so the whole document is never held in memory"""
+    buf, pos, dropped = "", 0, 0
+
+    def fail(msg):
+        """raises a ValueError giving the position of the error in f"""
+        raise ValueError("{}: {} at character {}".format(
+            getattr(f, "name", "snapshot"), msg, dropped + pos))
+
+    def peek():
+        """returns the next non-blank character, or "" at the end of f"""
+        nonlocal buf, pos, dropped
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            more = f.read(chunk)
+            if not more:
+                return ""
+            dropped += len(buf)
+            buf, pos = more, 0
+
+    def decode():
+        """decodes the JSON value at pos, reading more of f as needed"""
+        nonlocal buf, pos, dropped
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buf, pos)
+                return value
+            except json.JSONDecodeError as e:
+                more = f.read(max(chunk, len(buf)))
+                if not more:
+                    pos = e.pos
+                    fail(e.msg)
+                dropped += pos
+                buf, pos = buf[pos:] + more, 0
+
+    if peek() == "":
+        return
+    if peek() != "{":
+        fail("Expecting '{'")
+    pos += 1
+    sep = peek()
+    while sep != "}":
+        if sep != '"':
+            fail("Expecting property name enclosed in double quotes")
+        key = decode()
+        if peek() != ":":
+            fail("Expecting ':' delimiter")
+        pos += 1
+        peek()
+        value = decode()
+        if not isinstance(value, dict):
+            fail("Expecting an object for {}".format(key))
+        yield key, value
+        sep = peek()
+        if sep == ",":
+            pos += 1
+            sep = peek()
+            if sep == "}":
+                fail("Expecting property name enclosed in double quotes")
+        elif sep != "}":
+            fail("Expecting ',' delimiter")
+    pos += 1
+    if peek() != "":
+        fail("Extra data")
+
+
+class JSONSerializer:
+    """the standard library json format, with no header"""
+    name = "json"
+    header = b""
+
+    def dump(self, records, f):
+        """writes the (key, dictionary) pairs as one JSON object to the
+        binary file f, one record at a time"""
+        sep = b"{"
+        for key, value in records:
+            f.write(sep + self.encode(key) + b": " + self.encode(value))
+            sep = b", "
+        f.write(b"{}" if sep == b"{" else b"}")
+
+    def encode(self, value):
+        """returns value as JSON bytes"""
+        return json.dumps(value).encode("utf-8")
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs of the binary file f, which
+        is left open"""
+        text = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            yield from iter_snapshot(text)
+        finally:
+            text.detach()
+
+
+class OrjsonSerializer(JSONSerializer):
+    """the same JSON format, written and read with orjson; reading parses
+    the whole file at once, trading memory for speed"""
+    name = "orjson"
+
+    def encode(self, value):
+        """returns value as JSON bytes"""
+        return orjson.dumps(value)
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs of the binary file f"""
+        try:
+            records = orjson.loads(f.read())
+        except orjson.JSONDecodeError as e:
+            raise ValueError("{}: {}".format(getattr(f, "name", "snapshot"),
+                                             e))
+        if not isinstance(records, dict):
+            raise ValueError("{}: Expecting an object".format(
+                getattr(f, "name", "snapshot")))
+        return iter(records.items())
+
+
+class FramesSerializer:
+    """length-prefixed records: a 4 byte big-endian size, then the record
+    as a compact JSON [key, dictionary] array"""
+    name = "frames"
+    header = MAGIC + b"frames\n"
+
+    def dump(self, records, f):
+        """writes the (key, dictionary) pairs to the binary file f"""
+        if orjson is not None:
+            encode = orjson.dumps
+        else:
+            encode = json.JSONEncoder(separators=(",", ":")).encode
+        for key, value in records:
+            frame = encode([key, value])
+            if isinstance(frame, str):
+                frame = frame.encode("utf-8")
+            f.write(struct.pack(">I", len(frame)) + frame)
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs of the binary file f"""
+        decode = orjson.loads if orjson is not None else json.loads
+        offset = f.tell()
+        while True:
+            head = f.read(4)
+            if len(head) == 0:
+                return
+            size = struct.unpack(">I", head)[0] if len(head) == 4 else -1
+            frame = f.read(size) if size >= 0 else b""
+            if len(frame) != size:
+                raise ValueError("{}: Truncated record at byte {}".format(
+                    getattr(f, "name", "snapshot"), offset))
+            key, value = decode(frame)
+            yield key, value
+            offset += 4 + len(frame)
+
+
+class MsgpackSerializer:
+    """a stream of msgpack [key, dictionary] arrays"""
+    name = "msgpack"
+    header = MAGIC + b"msgpack\n"
+
+    def dump(self, records, f):
+        """writes the (key, dictionary) pairs to the binary file f"""
+        packer = msgpack.Packer()
+        for key, value in records:
+            f.write(packer.pack([key, value]))
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs of the binary file f"""
+        start = f.tell()
+        unpacker = msgpack.Unpacker(f, raw=False)
+        try:
+            for key, value in unpacker:
+                yield key, value
+        except ValueError as e:
+            raise ValueError("{}: {} at byte {}".format(
+                getattr(f, "name", "snapshot"), e, start + unpacker.tell()))
+        if start + unpacker.tell() != f.tell():
+            raise ValueError("{}: Truncated record at byte {}".format(
+                getattr(f, "name", "snapshot"), start + unpacker.tell()))
+
+
+serializers = {"json": JSONSerializer, "orjson": OrjsonSerializer,
+               "frames": FramesSerializer, "msgpack": MsgpackSerializer}
+# modules a serializer needs besides the standard library
+requires = {"orjson": orjson, "msgpack": msgpack}
+
+
+def get(name):
+    """returns the serializer called name"""
+    if name not in serializers:
+        raise ValueError("unknown storage format: {}".format(name))
+    if name in requires and requires[name] is None:
+        raise ValueError("storage format {} needs the {} module".format(
+            name, name))
+    return serializers[name]()
+
+
+def detect(f, preferred="json"):
+    """returns the serializer that wrote the binary file f, reading past
+    its header; JSON files are read with preferred if it is a JSON one"""
+    if f.peek(len(MAGIC))[:len(MAGIC)] == MAGIC:
+        return get(f.readline()[len(MAGIC):].strip().decode("ascii"))
+    if preferred in serializers and \
+       issubclass(serializers[preferred], JSONSerializer):
+        return get(preferred)
+    return get("json")
+
+
+def write(path, serializer, records):
+    """writes the (key, dictionary) pairs of records to path with
+    serializer, atomically: into a temporary file beside it, with the mode
+    of the file it replaces, synced then renamed over it"""
+    folder = os.path.dirname(path) or "."
+    # a file of its own, so that writers never share a temporary file
+    fd, tmp = tempfile.mkstemp(
+        dir=folder, prefix="." + os.path.basename(path) + ".")
+    try:
+        with open(fd, 'wb') as f:
+            try:
+                mode = stat.S_IMODE(os.stat(path).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.fchmod(f.fileno(), mode)
+            f.write(serializer.header)
+            serializer.dump(records, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    # the rename only survives a crash once the folder is on disk
+    dir_fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Contains the TextIndex class and the tokenizer of the full-text search
+"""
+
+import math
+import re
+
+# pattern - the words of a text: runs of letters and digits
+word = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """returns the lowercase words of text, none when it is not a string"""
+    if not isinstance(text, str):
+        return []
+    return word.findall(text.lower())
+
+
+class TextIndex:
+    """inverted index of the words of a set of documents, ranking them
+    against a query with BM25"""
+
+    def __init__(self, k1=1.2, b=0.75):
+        """initializes an empty index; k1 saturates the term frequencies
+        and b weighs the normalization by document length"""
+        self.k1 = k1
+        self.b = b
+        self.__postings = {}
+        self.__lengths = {}
+        self.__terms = {}
+        self.__total = 0
+
+    def __len__(self):
+        """returns the number of documents holding at least one word"""
+        return len(self.__lengths)
+
+    def set(self, key, text):
+        """indexes text as the document of key, replacing its former one"""
+        self.remove(key)
+        words = tokenize(text)
+        if len(words) == 0:
+            return
+        counts = {}
+        for term in words:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            self.__postings.setdefault(term, {})[key] = count
+        self.__lengths[key] = len(words)
+        self.__terms[key] = tuple(counts)
+        self.__total += len(words)
+
+    def remove(self, key):
+        """drops the document of key"""
+        length = self.__lengths.pop(key, None)
+        if length is None:
+            return
+        self.__total -= length
+        for term in self.__terms.pop(key):
+            postings = self.__postings[term]
+            del postings[key]
+            if len(postings) == 0:
+                del self.__postings[term]
+
+    def search(self, query, documents=None):
+        """returns (score, key) pairs of the documents holding a word of
+        query, best first then by key; documents is the size of the
+        collection the idf is computed over, len(self) by default"""
+        if len(self.__lengths) == 0:
+            return []
+        n = len(self.__lengths) if documents is None else documents
+        average = self.__total / len(self.__lengths)
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.__postings.get(term)
+            if postings is None:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for key, count in postings.items():
+                norm = self.k1 * (1 - self.b + self.b *
+                                  self.__lengths[key] / average)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(((score, key) for key, score in scores.items()),
+                      key=lambda pair: (-pair[0], pair[1]))
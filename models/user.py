@@ -29,6 +29,21 @@ class User(BaseModel, Base):
         """initializes user"""
         super().__init__(*args, **kwargs)
 
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter attribute returns the list of Place instances"""
+            from models.place import Place
+            places = models.storage.filter(Place, user_id=self.id)
+            return list(places.values())
+
+        @property
+        def reviews(self):
+            """getter attribute returns the list of Review instances"""
+            from models.review import Review
+            reviews = models.storage.filter(Review, user_id=self.id)
+            return list(reviews.values())
+
     def __setattr__(self, __name: str, __value):
         """Overrides the __setattr__ method"""
         if __name == "password":
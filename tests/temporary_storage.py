@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+"""
+Contains the TemporaryStorage class
+"""
+
+from models.engine.file_storage import FileStorage
+import os
+import tempfile
+
+
+class TemporaryStorage:
+    """mixin pointing FileStorage at a snapshot and a journal in a
+    temporary directory for the duration of each test; list it before
+    unittest.TestCase"""
+    # list - the FileStorage attributes restored after each test, named
+    # without their "_FileStorage__" prefix
+    attrs = ["objects", "file_path", "journal_path"]
+
+    def setUp(self):
+        """saves the storage attributes and empties the storage, whose
+        snapshot is at self.path"""
+        self.saved = {a: getattr(FileStorage, "_FileStorage__" + a)
+                      for a in self.attrs}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.json")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = self.path
+        FileStorage._FileStorage__journal_path = self.path + ".log"
+
+    def tearDown(self):
+        """restores the storage attributes"""
+        for a, value in self.saved.items():
+            setattr(FileStorage, "_FileStorage__" + a, value)
+        self.tmp.cleanup()
@@ -14,3 +14,10 @@ class TestApiAppV1(unittest.TestCase):
         '''test test'''
         with app.test_request_context('/states'):
             assert flask.request.path == '/states'
+
+    def test_metrics(self):
+        '''test that /metrics reports the storage counters'''
+        with app.test_client() as client:
+            resp = client.get('/api/v1/metrics')
+            self.assertEqual(resp.status_code, 200)
+            self.assertIsInstance(resp.get_json(), dict)
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""
+Contains the TestBatch class
+"""
+
+from api.v1.app import app
+from api.v1.views import batch
+import models
+from models.state import State
+from models.user import User
+from tests.temporary_storage import TemporaryStorage
+import unittest
+from unittest import mock
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestBatch(TemporaryStorage, unittest.TestCase):
+    '''tests the /<collection>/batch endpoints'''
+
+    def setUp(self):
+        '''points the storage at a temporary snapshot with a state and a
+        user'''
+        super().setUp()
+        self.state = State(name='Oyo')
+        self.user = User(email='a@b.c', password='pwd')
+        for obj in (self.state, self.user):
+            models.storage.new(obj)
+        models.storage.save()
+
+    def test_create_and_update(self):
+        '''test that every item gets its own result, in order'''
+        with app.test_client() as client:
+            resp = client.post('/api/v1/cities/batch', json=[
+                {'name': 'Ibadan', 'state_id': self.state.id},
+                {'name': 'Nowhere', 'state_id': 'missing'},
+                {'state_id': self.state.id},
+                'Ogbomosho',
+                {'name': 'Oyo', 'state_id': self.state.id,
+                 '__class__': 'State'}])
+            self.assertEqual(resp.status_code, 200)
+            results = resp.get_json()
+            self.assertEqual([r['status'] for r in results],
+                             [201, 404, 400, 400, 201])
+            self.assertEqual(results[2]['error'], 'Missing name')
+            self.assertEqual(results[4]['object']['__class__'], 'City')
+            city = results[0]['object']
+            resp = client.post('/api/v1/cities/batch', json=[
+                {'id': city['id'], 'name': 'Ibadan North',
+                 'state_id': 'ignored'}])
+            result = resp.get_json()[0]
+            self.assertEqual(result['status'], 200)
+            self.assertEqual(result['object']['name'], 'Ibadan North')
+            self.assertEqual(result['object']['state_id'], self.state.id)
+            self.assertEqual(result['object']['created_at'],
+                             city['created_at'])
+            resp = client.get('/api/v1/states/{}/cities'.format(
+                self.state.id))
+            self.assertEqual(len(resp.get_json()), 2)
+
+    def test_single_write(self):
+        '''test that a batch is saved at once'''
+        storage = models.storage
+        with app.test_client() as client:
+            with mock.patch.object(storage, 'save',
+                                   wraps=storage.save) as save:
+                resp = client.post('/api/v1/amenities/batch', json=[
+                    {'name': str(i)} for i in range(20)])
+            save.assert_called_once_with()
+            self.assertEqual(len(resp.get_json()), 20)
+            resp = client.post('/api/v1/users/batch', json=[
+                {'id': self.user.id, 'email': 'x@y.z', 'first_name': 'Ada'}])
+            self.assertEqual(resp.get_json()[0]['object']['email'], 'a@b.c')
+
+    def test_bad_items(self):
+        '''test that items with ids that are not strings fail alone'''
+        with app.test_client() as client:
+            resp = client.post('/api/v1/cities/batch', json=[
+                {'id': 5, 'name': 'x', 'state_id': self.state.id},
+                {'name': 'y', 'state_id': ['a']},
+                {'name': 'z', 'state_id': {'a': 1}},
+                {'id': ['a'], 'name': 'w', 'state_id': self.state.id},
+                {'name': 'Ibadan', 'state_id': self.state.id}])
+            self.assertEqual(resp.status_code, 200)
+            results = resp.get_json()
+            self.assertEqual([r['status'] for r in results],
+                             [400, 400, 400, 400, 201])
+            self.assertEqual(results[1]['error'], 'Invalid state_id')
+            self.assertEqual(results[3]['error'], 'Invalid id')
+
+    def test_bad_attributes(self):
+        '''test that items setting what cannot be set fail alone, without
+        storing the items before them'''
+        count = models.storage.count(State)
+        with app.test_client() as client:
+            resp = client.post('/api/v1/states/batch', json=[
+                {'name': 'Kano'},
+                {'id': self.state.id, 'cities': []},
+                {'name': 'Kaduna', 'cities': []}])
+            self.assertEqual(resp.status_code, 200)
+            results = resp.get_json()
+            self.assertEqual([r['status'] for r in results], [201, 400, 400])
+            self.assertEqual(results[1]['error'], 'Invalid cities')
+            resp = client.post('/api/v1/users/batch', json=[
+                {'email': 'x@y.z', 'password': 5},
+                {'id': self.user.id, 'password': ['pwd']}])
+            self.assertEqual([r['error'] for r in resp.get_json()],
+                             ['Invalid password', 'Invalid password'])
+        self.assertEqual(models.storage.count(State), count + 1)
+        self.assertEqual(models.storage.get(State, self.state.id).name, 'Oyo')
+
+    def test_bad_bodies(self):
+        '''test that bodies which are not arrays are rejected'''
+        with app.test_client() as client:
+            for body in ({'name': 'x'}, 'x'):
+                resp = client.post('/api/v1/states/batch', json=body)
+                self.assertEqual(resp.status_code, 400)
+            resp = client.post('/api/v1/states/batch', data='[',
+                               content_type='application/json')
+            self.assertEqual(resp.status_code, 400)
+            with mock.patch.object(batch, 'largest', 1):
+                resp = client.post('/api/v1/states/batch',
+                                   json=[{'name': 'a'}, {'name': 'b'}])
+            self.assertEqual(resp.status_code, 400)
+            resp = client.post('/api/v1/widgets/batch', json=[])
+            self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditional class
+"""
+
+from api.v1 import conditional
+from api.v1.app import app
+import models
+from models.amenity import Amenity
+from models.place import Place
+from models.state import State
+import pep8
+from tests.temporary_storage import TemporaryStorage
+import unittest
+from unittest import mock
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestConditional(TemporaryStorage, unittest.TestCase):
+    '''tests the ETag, Last-Modified and Cache-Control headers of the GET
+    endpoints'''
+
+    def setUp(self):
+        '''points the storage at a temporary snapshot with a state and a
+        place with an amenity'''
+        super().setUp()
+        self.state = State(name='Enugu')
+        self.amenity = Amenity(name='Wifi')
+        self.place = Place(name='Hut', amenity_ids=[self.amenity.id])
+        for obj in (self.state, self.amenity, self.place):
+            models.storage.new(obj)
+        models.storage.save()
+
+    def test_pep8_conformance_conditional(self):
+        '''Test that conditional.py and its tests conform to PEP8.'''
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'api/v1/conditional.py',
+            'tests/test_api/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def revalidate(self, client, url, **headers):
+        '''returns the response to url and to the request revalidating
+        it with its ETag'''
+        first = client.get(url, headers=headers)
+        self.assertEqual(first.status_code, 200)
+        first.get_data()
+        headers['If-None-Match'] = first.headers['ETag']
+        return first, client.get(url, headers=headers)
+
+    def test_object(self):
+        '''test that an unchanged object is answered with a 304, and a
+        changed one sent again'''
+        url = '/api/v1/states/' + self.state.id
+        with app.test_client() as client:
+            first, again = self.revalidate(client, url)
+            self.assertTrue(first.headers['ETag'].startswith('W/"'))
+            self.assertIn(self.state.id, first.headers['ETag'])
+            self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.data, b'')
+            self.assertEqual(again.headers['ETag'], first.headers['ETag'])
+            resp = client.get(url, headers={
+                'If-Modified-Since': first.headers['Last-Modified']})
+            self.assertEqual(resp.status_code, 304)
+            client.put(url, json={'name': 'Anambra'})
+            resp = client.get(url, headers={
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.get_json()['name'], 'Anambra')
+
+    def test_collection(self):
+        '''test that a list is tagged with the version of its class'''
+        with app.test_client() as client:
+            first, again = self.revalidate(client, '/api/v1/states')
+            self.assertEqual(again.status_code, 304)
+            self.assertIn('Accept', first.headers['Vary'])
+            ndjson = client.get('/api/v1/states', headers={
+                'Accept': 'application/x-ndjson',
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(ndjson.status_code, 200)
+            self.assertEqual(len(ndjson.get_data().splitlines()), 1)
+            self.assertNotEqual(ndjson.headers['ETag'], first.headers['ETag'])
+            client.post('/api/v1/amenities', json={'name': 'Pool'})
+            resp = client.get('/api/v1/states', headers={
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp.get_data(), b'')
+            client.post('/api/v1/states', json={'name': 'Imo'})
+            resp = client.get('/api/v1/states', headers={
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(resp.get_json()), 2)
+
+    def test_place_amenities(self):
+        '''test that the amenities of a place change with the place and
+        with the amenities'''
+        url = '/api/v1/places/{}/amenities'.format(self.place.id)
+        with app.test_client() as client:
+            first, again = self.revalidate(client, url)
+            self.assertEqual(again.status_code, 304)
+            client.put('/api/v1/amenities/' + self.amenity.id,
+                       json={'name': 'Fast wifi'})
+            resp = client.get(url, headers={
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.get_json()[0]['name'], 'Fast wifi')
+            first, again = self.revalidate(client, url)
+            client.delete('/api/v1/places/{}/amenities/{}'.format(
+                self.place.id, self.amenity.id))
+            resp = client.get(url, headers={
+                'If-None-Match': first.headers['ETag']})
+            self.assertEqual(resp.get_json(), [])
+
+    def test_cache_control(self):
+        '''test that the Cache-Control header can be changed or left out'''
+        with app.test_client() as client:
+            with mock.patch.object(conditional, 'cache_control',
+                                   'public, max-age=30'):
+                resp = client.get('/api/v1/stats')
+            self.assertEqual(resp.headers['Cache-Control'],
+                             'public, max-age=30')
+            with mock.patch.object(conditional, 'cache_control', ''):
+                resp = client.get('/api/v1/stats')
+            self.assertNotIn('Cache-Control', resp.headers)
+            first, again = self.revalidate(client, '/api/v1/stats')
+            self.assertEqual(again.status_code, 304)
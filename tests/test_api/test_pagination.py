@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagination class
+"""
+
+from api.v1.app import app
+from api.v1.pagination import decode_cursor, encode_cursor
+import json
+import models
+from models.state import State
+from tests.temporary_storage import TemporaryStorage
+import unittest
+from unittest import mock
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestPagination(TemporaryStorage, unittest.TestCase):
+    '''tests the limit and cursor parameters of the list endpoints'''
+
+    def setUp(self):
+        '''points the storage at a temporary snapshot with a few states'''
+        super().setUp()
+        self.states = [State(name=str(i)) for i in range(5)]
+        for state in self.states:
+            models.storage.new(state)
+        models.storage.save()
+
+    def test_cursor_round_trip(self):
+        '''test that a cursor decodes to the key of its object'''
+        state = self.states[0]
+        self.assertEqual(decode_cursor(encode_cursor(state)),
+                         (state.created_at, state.id))
+
+    def test_walk_pages(self):
+        '''test that following the cursors lists every state once'''
+        names = []
+        url = '/api/v1/states?limit=2'
+        with app.test_client() as client:
+            while url is not None:
+                resp = client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                self.assertLessEqual(len(resp.get_json()), 2)
+                names += [state['name'] for state in resp.get_json()]
+                cursor = resp.headers.get('X-Next-Cursor')
+                url = None
+                if cursor is not None:
+                    self.assertIn(cursor, resp.headers['Link'])
+                    url = '/api/v1/states?limit=2&cursor=' + cursor
+        self.assertEqual(names, ['0', '1', '2', '3', '4'])
+
+    def test_no_limit(self):
+        '''test that without a limit every state is listed'''
+        with app.test_client() as client:
+            resp = client.get('/api/v1/states')
+            self.assertEqual(len(resp.get_json()), 5)
+            self.assertNotIn('X-Next-Cursor', resp.headers)
+
+    def test_streamed(self):
+        '''test that the list is streamed as an array or as NDJSON'''
+        with mock.patch('api.v1.pagination.batch', 2):
+            with app.test_client() as client:
+                resp = client.get('/api/v1/states')
+                self.assertTrue(resp.is_streamed)
+                self.assertEqual([s['name'] for s in resp.get_json()],
+                                 ['0', '1', '2', '3', '4'])
+                resp = client.get('/api/v1/states?limit=3', headers={
+                    'Accept': 'application/x-ndjson'})
+                self.assertEqual(resp.mimetype, 'application/x-ndjson')
+                lines = resp.get_data(as_text=True).splitlines()
+                self.assertEqual([json.loads(line)['name'] for line in lines],
+                                 ['0', '1', '2'])
+
+    def test_bad_arguments(self):
+        '''test that malformed limits and cursors are rejected'''
+        with app.test_client() as client:
+            for query in ('limit=0', 'limit=x', 'cursor=nope', 'cursor=W10'):
+                resp = client.get('/api/v1/states?' + query)
+                self.assertEqual(resp.status_code, 400, query)
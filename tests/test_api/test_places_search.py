@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesSearch class
+"""
+
+from api.v1.app import app
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from tests.temporary_storage import TemporaryStorage
+import unittest
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestPlacesSearch(TemporaryStorage, unittest.TestCase):
+    '''tests the /places_search endpoint'''
+
+    def setUp(self):
+        '''points the storage at a temporary snapshot with a few places'''
+        super().setUp()
+        storage = models.storage
+        self.state = State(name='Oyo')
+        self.cities = [City(name='Ibadan', state_id=self.state.id),
+                       City(name='Ogbomosho', state_id=self.state.id),
+                       City(name='Abeokuta', state_id='elsewhere')]
+        self.wifi = Amenity(name='Wifi')
+        self.pool = Amenity(name='Pool')
+        self.places = [
+            Place(name='A', city_id=self.cities[0].id,
+                  amenity_ids=[self.wifi.id]),
+            Place(name='B', city_id=self.cities[1].id,
+                  amenity_ids=[self.wifi.id, self.pool.id]),
+            Place(name='C', city_id=self.cities[2].id,
+                  amenity_ids=[self.pool.id])]
+        for obj in [self.state, self.wifi, self.pool] + self.cities + \
+                self.places:
+            storage.new(obj)
+        storage.save()
+
+    def search(self, body):
+        '''posts body to /places_search and returns the place names'''
+        with app.test_client() as client:
+            resp = client.post('/api/v1/places_search', json=body)
+            self.assertEqual(resp.status_code, 200)
+            return sorted(place['name'] for place in resp.get_json())
+
+    def test_empty_body(self):
+        '''test that an empty body returns every place'''
+        self.assertEqual(self.search({}), ['A', 'B', 'C'])
+        self.assertEqual(self.search({'states': [], 'cities': []}),
+                         ['A', 'B', 'C'])
+
+    def test_states_and_cities(self):
+        '''test that states and cities are combined'''
+        self.assertEqual(self.search({'states': [self.state.id]}),
+                         ['A', 'B'])
+        self.assertEqual(self.search({'states': [self.state.id],
+                                      'cities': [self.cities[2].id]}),
+                         ['A', 'B', 'C'])
+        self.assertEqual(self.search({'cities': ['nope']}), [])
+
+    def test_amenities(self):
+        '''test that places must have every requested amenity'''
+        self.assertEqual(self.search({'amenities': [self.pool.id]}),
+                         ['B', 'C'])
+        self.assertEqual(self.search({'amenities': [self.pool.id,
+                                                    self.wifi.id]}),
+                         ['B'])
+        self.assertEqual(self.search({'states': [self.state.id],
+                                      'amenities': [self.pool.id]}),
+                         ['B'])
+
+    def test_invalid_ids(self):
+        '''test that states, cities and amenities must be lists of ids'''
+        with app.test_client() as client:
+            for bad in ({'states': [{'a': 1}]}, {'amenities': [['x']]},
+                        {'cities': 'nope'}, {'states': [self.state.id, 5]}):
+                resp = client.post('/api/v1/places_search', json=bad)
+                self.assertEqual(resp.status_code, 400)
+
+    def test_numeric_ranges(self):
+        '''test that numeric attributes are filtered on their ranges'''
+        self.places[0].max_guest = 4
+        self.places[0].price_by_night = 120
+        models.storage.new(self.places[0])
+        self.assertEqual(self.search({'max_guest': {'min': 2}}), ['A'])
+        self.assertEqual(self.search({'price_by_night': {'max': 100}}),
+                         ['B', 'C'])
+        self.assertEqual(self.search({'states': [self.state.id],
+                                      'price_by_night': {'min': 100,
+                                                         'max': 200}}),
+                         ['A'])
+        with app.test_client() as client:
+            for bad in ({'max_guest': 2}, {'latitude': {'min': 'x'}}):
+                resp = client.post('/api/v1/places_search', json=bad)
+                self.assertEqual(resp.status_code, 400)
+
+    def test_box(self):
+        '''test that places are filtered on a latitude/longitude box'''
+        for place, lng in zip(self.places, (3.9, 3.95, 4.2)):
+            place.latitude = 7.4
+            place.longitude = lng
+            models.storage.new(place)
+        self.assertEqual(self.search({'box': [7, 3.8, 8, 4]}), ['A', 'B'])
+        self.assertEqual(self.search({'box': [7, 3.8, 8, 4],
+                                      'amenities': [self.pool.id]}),
+                         ['B'])
+        with app.test_client() as client:
+            for bad in ([7, 3.8, 8], [8, 3.8, 7, 4], [7, 3.8, 8, 'x']):
+                resp = client.post('/api/v1/places_search',
+                                   json={'box': bad})
+                self.assertEqual(resp.status_code, 400)
+
+    def test_places_near(self):
+        '''test that /places_near returns the closest places first'''
+        for place, lng in zip(self.places, (3.95, 3.9, 4.2)):
+            place.latitude = 7.4
+            place.longitude = lng
+            models.storage.new(place)
+        with app.test_client() as client:
+            resp = client.get('/api/v1/places_near?latitude=7.4'
+                              '&longitude=4&k=2')
+            self.assertEqual(resp.status_code, 200)
+            found = resp.get_json()
+            self.assertEqual([pl['name'] for pl in found], ['A', 'B'])
+            self.assertAlmostEqual(found[0]['distance'], 5.5, places=1)
+            resp = client.get('/api/v1/places_near?latitude=7.4'
+                              '&longitude=4&radius=8')
+            self.assertEqual([pl['name'] for pl in resp.get_json()], ['A'])
+            for bad in ('latitude=7.4', 'latitude=91&longitude=0',
+                        'latitude=1&longitude=1&radius=-1',
+                        'latitude=1&longitude=1&k=0'):
+                resp = client.get('/api/v1/places_near?' + bad)
+                self.assertEqual(resp.status_code, 400)
+
+    def test_not_a_json(self):
+        '''test that a body that is not a JSON object is rejected'''
+        with app.test_client() as client:
+            resp = client.post('/api/v1/places_search', json=[1])
+            self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Contains the TestSearch class
+"""
+
+from api.v1.app import app
+import models
+from models.place import Place
+from models.review import Review
+from tests.temporary_storage import TemporaryStorage
+import unittest
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestSearch(TemporaryStorage, unittest.TestCase):
+    '''tests the /search endpoint'''
+
+    def setUp(self):
+        '''points the storage at a temporary snapshot with a few places
+        and reviews'''
+        super().setUp()
+        self.places = [Place(name='Lake cabin',
+                             description='A cabin on the lake, lake view'),
+                       Place(name='Downtown loft', description='Near a lake'),
+                       Place(name='Farm', description='Cows and a barn')]
+        self.reviews = [Review(text='Great lake, quiet cabin'),
+                        Review(text='Noisy loft')]
+        for obj in self.places + self.reviews:
+            models.storage.new(obj)
+        models.storage.save()
+
+    def test_search(self):
+        '''test that places and reviews come best first with a score'''
+        with app.test_client() as client:
+            resp = client.get('/api/v1/search?q=lake+cabin')
+            self.assertEqual(resp.status_code, 200)
+            found = resp.get_json()
+            self.assertEqual(len(found), 3)
+            self.assertEqual(found[0]['id'], self.places[0].id)
+            self.assertCountEqual([hit['id'] for hit in found[1:]],
+                                  [self.places[1].id, self.reviews[0].id])
+            scores = [hit['score'] for hit in found]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            resp = client.get('/api/v1/search?q=loft&type=Review')
+            self.assertEqual([hit['__class__'] for hit in resp.get_json()],
+                             ['Review'])
+            resp = client.get('/api/v1/search?q=submarine')
+            self.assertEqual(resp.get_json(), [])
+
+    def test_pages(self):
+        '''test that the cursor walks the hits in order'''
+        with app.test_client() as client:
+            every = client.get('/api/v1/search?q=lake').get_json()
+            seen = []
+            url = '/api/v1/search?q=lake&limit=2'
+            while url is not None:
+                resp = client.get(url)
+                seen.extend(hit['id'] for hit in resp.get_json())
+                cursor = resp.headers.get('X-Next-Cursor')
+                url = None if cursor is None else \
+                    '/api/v1/search?q=lake&limit=2&cursor=' + cursor
+            self.assertEqual(seen, [hit['id'] for hit in every])
+
+    def test_bad_arguments(self):
+        '''test that missing queries and bad arguments are rejected'''
+        with app.test_client() as client:
+            for args in ('', 'q=+', 'q=lake&type=User', 'q=lake&limit=0',
+                         'q=lake&cursor=WzFd'):
+                resp = client.get('/api/v1/search?' + args)
+                self.assertEqual(resp.status_code, 400)
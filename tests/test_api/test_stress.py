@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestConcurrentRequests class
+"""
+
+from api.v1.app import app
+import models
+from models.engine.file_storage import FileStorage
+from models.state import State
+import threading
+from tests.temporary_storage import TemporaryStorage
+import unittest
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestConcurrentRequests(TemporaryStorage, unittest.TestCase):
+    '''hammers the API from several threads at once'''
+    writers = 8
+    posts = 20
+    readers = 4
+
+    def test_no_lost_writes(self):
+        '''test that concurrent posts all land while reads keep working'''
+        failures = []
+        done = threading.Event()
+
+        def write(n):
+            '''posts states, then renames each of them'''
+            client = app.test_client()
+            for i in range(self.posts):
+                name = "{}-{}".format(n, i)
+                resp = client.post('/api/v1/states', json={'name': name})
+                if resp.status_code != 201:
+                    failures.append(resp.status_code)
+                    continue
+                resp = client.put('/api/v1/states/' + resp.get_json()['id'],
+                                  json={'name': name + '!'})
+                if resp.status_code != 200:
+                    failures.append(resp.status_code)
+
+        def read():
+            '''lists states and stats until the writers are done'''
+            client = app.test_client()
+            while not done.wait(0.01):
+                for url in ('/api/v1/states', '/api/v1/stats'):
+                    resp = client.get(url)
+                    if resp.status_code != 200:
+                        failures.append(resp.status_code)
+
+        writers = [threading.Thread(target=write, args=(n,))
+                   for n in range(self.writers)]
+        readers = [threading.Thread(target=read) for n in range(self.readers)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        storage = models.storage
+        self.assertEqual(storage.count(State), self.writers * self.posts)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        names = sorted(s.name for s in storage.all(State).values())
+        self.assertEqual(names, sorted("{}-{}!".format(n, i)
+                                       for n in range(self.writers)
+                                       for i in range(self.posts)))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestConcurrentDBRequests(unittest.TestCase):
+    '''reads the API from more threads than the pool has connections'''
+    threads = 16
+    requests = 10
+
+    def test_pool_under_load(self):
+        '''test that every request gets a connection and gives it back'''
+        State(name='Loaded').save()
+        before = models.storage.metrics()
+        failures = []
+
+        def read():
+            '''lists states and gets the stats'''
+            client = app.test_client()
+            for i in range(self.requests):
+                for url in ('/api/v1/states', '/api/v1/stats'):
+                    resp = client.get(url)
+                    if resp.status_code != 200:
+                        failures.append(resp.status_code)
+
+        readers = [threading.Thread(target=read)
+                   for n in range(self.threads)]
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        with app.test_client() as client:
+            after = client.get('/api/v1/metrics').get_json()
+        self.assertGreaterEqual(after['pool_checkouts'] -
+                                before['pool_checkouts'],
+                                self.threads * self.requests)
+        self.assertEqual(after['pool_timeouts'], 0)
+        self.assertLessEqual(after['pool_checked_out'], 1)
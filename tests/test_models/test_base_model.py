@@ -138,6 +138,33 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_to_dict_follows_timestamps(self):
+        """test that to_dict reflects timestamps changed after a call"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        bm = BaseModel()
+        self.assertEqual(bm.to_dict(), bm.to_dict())
+        bm.updated_at = datetime(2001, 2, 3, 4, 5, 6)
+        self.assertEqual(bm.to_dict()["updated_at"],
+                         "2001-02-03T04:05:06.000000")
+        self.assertEqual(bm.to_dict()["created_at"],
+                         bm.created_at.strftime(t_format))
+
+    def test_to_dicts(self):
+        """test that to_dicts yields the to_dict of every object"""
+        objs = [BaseModel(), BaseModel()]
+        dicts = models.base_model.to_dicts(objs)
+        self.assertEqual(list(dicts), [obj.to_dict() for obj in objs])
+
+    def test_from_storage(self):
+        """test that _from_storage rebuilds the object to_dict describes"""
+        inst = BaseModel()
+        inst.name = "Holberton"
+        with mock.patch.object(BaseModel, "__init__") as init:
+            copy = BaseModel._from_storage(inst.to_dict())
+            self.assertFalse(init.called)
+        self.assertIs(type(copy), BaseModel)
+        self.assertEqual(copy.__dict__, inst.__dict__)
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Contains the TestObjectCache and TestSharedCache classes
+"""
+
+from datetime import datetime
+from models.engine.cache import ObjectCache, SharedCache
+import os
+import pep8
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class Clock:
+    """clock moved by hand"""
+
+    def __init__(self):
+        """starts at 0"""
+        self.now = 0.0
+
+    def __call__(self):
+        """returns the current time"""
+        return self.now
+
+
+class TestObjectCache(unittest.TestCase):
+    """Test the ObjectCache class"""
+
+    def make(self, size, ttl):
+        """returns the cache under test"""
+        return ObjectCache(size, ttl, self.clock)
+
+    def setUp(self):
+        """creates a cache of three entries living ten seconds"""
+        self.clock = Clock()
+        self.cache = self.make(3, 10)
+
+    def test_pep8_conformance_cache(self):
+        """Test that cache.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/cache.py',
+            'tests/test_models/test_engine/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_get_and_put(self):
+        """test that values come back until discarded or cleared"""
+        value = {"id": "1", "created_at": datetime(2020, 1, 1)}
+        self.assertIsNone(self.cache.get("State.1"))
+        self.cache.put("State.1", value)
+        self.assertEqual(self.cache.get("State.1"), value)
+        self.cache.put("State.1", {"id": "1"})
+        self.assertEqual(self.cache.get("State.1"), {"id": "1"})
+        self.cache.discard("State.1")
+        self.cache.discard("State.2")
+        self.assertIsNone(self.cache.get("State.1"))
+        self.cache.put("State.2", value)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+    def test_lru(self):
+        """test that the least recently read entry is evicted"""
+        for key in "abc":
+            self.cache.put(key, key)
+        self.clock.now = 1
+        self.cache.get("a")
+        self.clock.now = 2
+        self.cache.put("d", "d")
+        self.assertIsNone(self.cache.get("b"))
+        for key in "acd":
+            self.assertEqual(self.cache.get(key), key)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertEqual(len(self.cache), 3)
+
+    def test_ttl(self):
+        """test that entries expire ttl seconds after they are stored"""
+        self.cache.put("a", 1)
+        self.clock.now = 9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["expirations"], stats["entries"]), (1, 0))
+
+
+class TestSharedCache(TestObjectCache):
+    """Test the SharedCache class"""
+
+    def make(self, size, ttl):
+        """returns a cache kept in a temporary file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.db")
+        return SharedCache(self.path, size, ttl, self.clock)
+
+    def test_processes(self):
+        """test that entries stored by a process are read by the others"""
+        cache = SharedCache(self.path, 10, 60)
+        env = {name: value for name, value in os.environ.items()
+               if name != "HBNB_TYPE_STORAGE"}
+        subprocess.run([sys.executable, "-c",
+                        "from models.engine.cache import SharedCache; "
+                        "SharedCache({!r}, 10, 60).put('State.1', "
+                        "{{'name': 'shared'}})".format(self.path)],
+                       env=env, check=True)
+        self.assertEqual(cache.get("State.1"), {"name": "shared"})
+        cache.discard("State.1")
+        self.assertIsNone(SharedCache(self.path, 10, 60).get("State.1"))
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Contains the TestColumns class
+"""
+
+from models.engine import columns
+from models.place import Place
+import math
+import pep8
+import unittest
+from unittest import mock
+Columns = columns.Columns
+
+
+class TestColumns(unittest.TestCase):
+    """Test the Columns class"""
+    def setUp(self):
+        """fills columns with a few places"""
+        self.cols = Columns(("price_by_night", "max_guest"))
+        self.places = [Place(price_by_night=50 * i, max_guest=i)
+                       for i in range(5)]
+        for place in self.places:
+            self.cols.set(place.id, place)
+
+    def select(self, ranges):
+        """returns the selected keys, with and without numpy"""
+        keys = sorted(self.cols.select(ranges))
+        with mock.patch.object(columns, "numpy", None):
+            self.assertEqual(sorted(self.cols.select(ranges)), keys)
+        return keys
+
+    def test_pep8_conformance_columns(self):
+        """Test that columns.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/columns.py',
+            'tests/test_models/test_engine/test_columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_select_ranges(self):
+        """test that select keeps the rows within every range"""
+        ids = [place.id for place in self.places]
+        self.assertEqual(self.select({"price_by_night": (50, 150)}),
+                         sorted(ids[1:4]))
+        self.assertEqual(self.select({"price_by_night": (None, 150),
+                                      "max_guest": (2, None)}),
+                         sorted(ids[2:4]))
+        self.assertEqual(self.select({"max_guest": (9, None)}), [])
+
+    def test_set_and_remove(self):
+        """test that rows follow updates and stay packed on removal"""
+        first = self.places[0]
+        first.price_by_night = 1000
+        self.cols.set(first.id, first)
+        self.assertEqual(self.select({"price_by_night": (900, None)}),
+                         [first.id])
+        self.cols.remove(self.places[1].id)
+        self.cols.remove(self.places[1].id)
+        self.assertEqual(len(self.cols), 4)
+        self.assertEqual(self.cols.get(self.places[4].id, "max_guest"), 4)
+        self.assertIsNone(self.cols.get(self.places[1].id, "max_guest"))
+        for place in self.places:
+            self.cols.remove(place.id)
+        self.assertEqual(self.select({"max_guest": (None, None)}), [])
+
+    def test_not_a_number(self):
+        """test that missing values never match a bound"""
+        place = Place(price_by_night="free", max_guest=0)
+        self.cols.set(place.id, place)
+        self.assertTrue(math.isnan(self.cols.get(place.id,
+                                                 "price_by_night")))
+        self.assertNotIn(place.id, self.select({"price_by_night": (0, None)}))
+        self.assertIn(place.id, self.select({"max_guest": (0, None)}))
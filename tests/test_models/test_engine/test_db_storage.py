@@ -17,7 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -121,3 +123,219 @@ class TestDBStorage(unittest.TestCase):
         self.assertGreater(storage.count(), storage.count(State))
         with self.assertRaises(TypeError):
             storage.count(State, 'op')
+
+    def test_count_tracks_new_and_delete(self):
+        """test that count follows objects being added and deleted"""
+        storage = models.storage
+        total = storage.count()
+        states = storage.count(State)
+        obj = State(name='Kaduna')
+        obj.save()
+        self.assertEqual(storage.count(State), states + 1)
+        self.assertEqual(storage.count("State"), states + 1)
+        self.assertEqual(storage.count(), total + 1)
+        storage.delete(obj)
+        storage.save()
+        self.assertEqual(storage.count(State), states)
+        self.assertEqual(storage.count(), total)
+        self.assertEqual(storage.count(int), 0)
+
+    def test_filter(self):
+        """test that filter returns only the rows matching the criteria"""
+        storage = models.storage
+        state = State(name='Bauchi')
+        state.save()
+        other = State(name='Jigawa')
+        other.save()
+        city = City(name='Azare', state_id=state.id)
+        city.save()
+        found = storage.filter(City, state_id=state.id)
+        self.assertEqual(list(found), ["City." + city.id])
+        self.assertEqual(storage.filter(City, state_id=other.id), {})
+        found = storage.filter(State, id=[state.id, other.id])
+        self.assertEqual(len(found), 2)
+        self.assertIs(storage.get(City, city.id), city)
+
+    def test_search_places(self):
+        """test that search_places keeps places having every amenity"""
+        storage = models.storage
+        state = State(name='Kano')
+        state.save()
+        city = City(name='Kano', state_id=state.id)
+        city.save()
+        user = User(email='a@b.c', password='pwd')
+        user.save()
+        wifi = Amenity(name='Wifi')
+        wifi.save()
+        pool = Amenity(name='Pool')
+        pool.save()
+        both = Place(name='Both', city_id=city.id, user_id=user.id)
+        both.amenities.extend([wifi, pool])
+        both.save()
+        one = Place(name='One', city_id=city.id, user_id=user.id)
+        one.amenities.append(wifi)
+        one.save()
+        found = storage.search_places([city.id], [wifi.id, pool.id])
+        self.assertEqual(list(found), ["Place." + both.id])
+        found = storage.search_places([city.id], [wifi.id])
+        self.assertCountEqual(found, ["Place." + both.id, "Place." + one.id])
+        self.assertEqual(storage.search_places([], None), {})
+        one.price_by_night = 90
+        one.save()
+        found = storage.search_places([city.id], [wifi.id],
+                                      {"price_by_night": (50, 100)})
+        self.assertEqual(list(found), ["Place." + one.id])
+
+    def test_search(self):
+        """test that search ranks the text of places and reviews"""
+        storage = models.storage
+        state = State(name='Ogun')
+        state.save()
+        city = City(name='Abeokuta', state_id=state.id)
+        city.save()
+        user = User(email='a@b.c', password='pwd')
+        user.save()
+        place = Place(name='Platypus creek', city_id=city.id,
+                      user_id=user.id,
+                      description='platypus platypus lagoon')
+        place.save()
+        other = Place(name='Echidna hill', city_id=city.id, user_id=user.id)
+        other.save()
+        review = Review(text='a platypus swam by', place_id=place.id,
+                        user_id=user.id)
+        review.save()
+        found = storage.search('platypus')
+        self.assertEqual([obj for score, obj in found], [place, review])
+        self.assertEqual(storage.search('platypus', Review), found[1:])
+        self.assertEqual(storage.search('platypus', limit=1), found[:1])
+        after = (found[0][0], 'Place.' + place.id)
+        self.assertEqual(storage.search('platypus', after=after), found[1:])
+        self.assertEqual(storage.search('wallaby'), [])
+
+    def test_search_without_fulltext(self):
+        """test that search ranks words itself when MySQL finds no
+        FULLTEXT index"""
+        storage = models.storage
+        state = State(name='Western Australia')
+        state.save()
+        city = City(name='Perth', state_id=state.id)
+        city.save()
+        user = User(email='a@b.c', password='pwd')
+        user.save()
+        place = Place(name='Quokka isle', city_id=city.id, user_id=user.id)
+        place.save()
+        missing = sqlalchemy.exc.OperationalError(
+            "SELECT", {}, Exception(1191, "Can't find FULLTEXT index"))
+        dialect = storage._DBStorage__engine.dialect
+        with mock.patch.object(dialect, "name", "mysql"), \
+                mock.patch.object(storage, "_DBStorage__match",
+                                  side_effect=missing):
+            found = storage.search('quokka', Place)
+        self.assertEqual([obj for score, obj in found], [place])
+
+    def test_index_existing_tables(self):
+        """test that the indexes missing from existing tables are made"""
+        engine = models.storage._DBStorage__engine
+        index, = [index for index in Place.__table__.indexes
+                  if index.name == "places_text"]
+        index.drop(engine)
+        models.storage._DBStorage__index()
+        names = [index["name"] for index in
+                 sqlalchemy.inspect(engine).get_indexes("places")]
+        self.assertIn("places_text", names)
+
+    def test_near_and_within(self):
+        """test that near grows its box until it holds k places"""
+        storage = models.storage
+        state = State(name='Lagos')
+        state.save()
+        city = City(name='Lagos', state_id=state.id)
+        city.save()
+        user = User(email='a@b.c', password='pwd')
+        user.save()
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id,
+                        latitude=-70.0 + 5 * i, longitude=179.9)
+                  for i in range(3)]
+        for place in places:
+            place.save()
+        found = storage.near(Place, -70, -179.9, None, 2)
+        self.assertEqual([place for d, place in found], places[:2])
+        found = storage.near(Place, -70, -179.9, 100)
+        self.assertEqual([place for d, place in found], places[:1])
+        found = storage.within(Place, -71, 179, -64, -179)
+        self.assertCountEqual(found, ["Place." + p.id for p in places[:2]])
+
+    def test_bulk_upsert(self):
+        """test that bulk_upsert commits its objects a batch at a time"""
+        storage = models.storage
+        states = [State(name=str(i)) for i in range(3)]
+        storage.bulk_new(states)
+        dicts = [{"id": states[0].id, "name": "Renamed"},
+                 {"name": "Added"}, {"id": states[2].id, "name": "Two"}]
+        with mock.patch.object(db_storage.DBStorage,
+                               "_DBStorage__bulk_batch", 2):
+            done = storage.bulk_upsert(State, dicts)
+        self.assertEqual([created for obj, created in done],
+                         [False, True, False])
+        storage.close()
+        self.assertEqual(storage.get(State, states[0].id).name, "Renamed")
+        self.assertEqual(storage.get(State, states[1].id).name, "1")
+        self.assertEqual(storage.get(State, done[1][0].id).name, "Added")
+        self.assertEqual(storage.get(State, states[2].id).name, "Two")
+        count = storage.count(State)
+        with self.assertRaises(ValueError):
+            storage.bulk_upsert(State, [{"name": "Kept out"},
+                                        {"id": states[0].id, "cities": []}])
+        self.assertEqual(storage.count(State), count)
+
+    def test_version(self):
+        """test that the version of a class changes once the changes to its
+        rows are committed, in one counter shared by every process"""
+        storage = models.storage
+        before = storage.version(State), storage.version(City)
+        state = State(name="Versioned")
+        state.save()
+        after = storage.version(State)
+        self.assertEqual(int(after), int(before[0]) + 1)
+        self.assertEqual(storage.version(City), before[1])
+        state.name = "Renamed"
+        storage.all(City)
+        self.assertEqual(storage.version(State), str(int(after) + 1))
+        storage.close()
+        self.assertEqual(storage.version(State), after)
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+        self.assertEqual(storage.version(State), str(int(after) + 1))
+
+    def test_version_per_commit(self):
+        """test that a transaction flushing a class many times counts it
+        once in versions"""
+        storage = models.storage
+        before = int(storage.version(State))
+        state = State(name="Flushed")
+        storage.new(state)
+        for name in ("once", "twice", "thrice"):
+            state.name = name
+            storage._DBStorage__session.flush()
+        self.assertEqual(storage.version(State), str(before + 1))
+        storage.save()
+        self.assertEqual(storage.version(State), str(before + 1))
+        storage.close()
+        self.assertEqual(storage.version(State), str(before + 1))
+
+    def test_page(self):
+        """test that page walks the rows in (created_at, id) order"""
+        storage = models.storage
+        state = State(name='Kwara')
+        state.save()
+        created_at = datetime(2000, 1, 1)
+        cities = [City(name=str(i), state_id=state.id,
+                       id="{}-{}".format(state.id, i)) for i in range(4)]
+        for obj in cities:
+            obj.created_at = created_at
+            obj.save()
+        self.assertEqual(storage.page(City, state_id=state.id), cities)
+        first = storage.page(City, 3, state_id=state.id)
+        after = (first[-1].created_at, first[-1].id)
+        self.assertEqual(storage.page(City, 3, after,
+                                      state_id=state.id), cities[3:])
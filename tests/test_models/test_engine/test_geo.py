@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeo class
+"""
+
+from models.engine import geo
+import pep8
+import random
+import unittest
+Grid = geo.Grid
+
+
+class TestGeo(unittest.TestCase):
+    """Test the Grid class and the distance helpers"""
+    def setUp(self):
+        """fills a grid with random points, a cluster of them in Europe"""
+        rand = random.Random(19)
+        self.grid = Grid(1)
+        self.points = {}
+        for i in range(2000):
+            if i % 2:
+                point = (rand.gauss(48, 2), rand.gauss(2, 3))
+            else:
+                point = (rand.uniform(-90, 90), rand.uniform(-180, 180))
+            self.points[i] = point
+            self.grid.set(i, *point)
+
+    def brute(self, lat, lng, radius=None, k=None):
+        """returns what near() should, from a scan of every point"""
+        pairs = sorted((geo.distance(lat, lng, *point), key)
+                       for key, point in self.points.items())
+        if radius is not None:
+            pairs = [pair for pair in pairs if pair[0] <= radius]
+        return pairs[:k]
+
+    def test_pep8_conformance_geo(self):
+        """Test that geo.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/geo.py',
+            'tests/test_models/test_engine/test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_distance_and_box(self):
+        """test the haversine distance and the box around a radius"""
+        self.assertAlmostEqual(geo.distance(0, 0, 0, 1), geo.KM_PER_DEGREE)
+        self.assertAlmostEqual(geo.distance(48.8566, 2.3522, 51.5074,
+                                            -0.1278), 343.5, places=0)
+        south, west, north, east = geo.box(0, 179.5, geo.KM_PER_DEGREE)
+        self.assertAlmostEqual(west, 178.5, places=3)
+        self.assertAlmostEqual(east, -179.5, places=3)
+        south, west, north, east = geo.box(89, 0, 5 * geo.KM_PER_DEGREE)
+        self.assertAlmostEqual(south, 84)
+        self.assertEqual((west, north, east), (-180.0, 90.0, 180.0))
+        self.assertIsNone(geo.position(91, 0))
+        self.assertIsNone(geo.position("1", 0))
+        self.assertEqual(geo.position(1, 2), (1.0, 2.0))
+
+    def test_near(self):
+        """test that near() agrees with a scan of every point"""
+        rand = random.Random(20)
+        for _ in range(50):
+            lat, lng = rand.uniform(-90, 90), rand.uniform(-180, 180)
+            for radius, k in ((None, 5), (800, None), (3000, 4)):
+                self.assertEqual(self.grid.near(lat, lng, radius, k),
+                                 self.brute(lat, lng, radius, k))
+        self.assertEqual(self.grid.near(48, 2, None, 20),
+                         self.brute(48, 2, None, 20))
+        self.assertEqual(len(self.grid.near(0, 0)), 2000)
+        self.assertEqual(self.grid.near(0, 0, k=0), [])
+
+    def test_within(self):
+        """test that within() keeps the points of the box, across the
+        antimeridian too"""
+        boxes = ((40, -5, 50, 5), (-30, 170, 30, -170), (-90, -180, 90, 180))
+        for box in boxes:
+            south, west, north, east = box
+            expected = [key for key, (lat, lng) in self.points.items()
+                        if south <= lat <= north and
+                        (west <= lng <= east if west <= east else
+                         lng >= west or lng <= east)]
+            self.assertCountEqual(self.grid.within(*box), expected)
+
+    def test_antimeridian(self):
+        """test that a point at longitude 180 is found by the boxes that
+        reach the antimeridian from either side"""
+        self.grid.set("edge", 10, 180)
+        for box in ((9, 179, 11, 180), (9, -180, 11, -179), (9, 179, 11, -179),
+                    (9, 180, 11, 180), (-90, -180, 90, 180)):
+            self.assertEqual(self.grid.within(*box).count("edge"), 1)
+        self.assertNotIn("edge", self.grid.within(9, 170, 11, 179.9))
+        self.assertEqual(self.grid.near(10, -179.99, k=1)[0][1], "edge")
+
+    def test_set_and_remove(self):
+        """test that points move, go away and skip invalid positions"""
+        self.grid.set(0, 10, 10)
+        self.assertEqual(self.grid.near(10, 10, k=1), [(0.0, 0)])
+        self.grid.set(0, None, 10)
+        self.assertNotIn(0, self.grid.within(9, 9, 11, 11))
+        self.assertEqual(len(self.grid), 1999)
+        for key in self.points:
+            self.grid.remove(key)
+        self.assertEqual(len(self.grid), 0)
+        self.assertEqual(self.grid.near(10, 10, 100, 3), [])
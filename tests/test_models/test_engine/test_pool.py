@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Contains the TestMeteredPool class
+"""
+
+from models.engine.pool import MeteredPool
+import os
+import pep8
+from sqlalchemy import create_engine, exc, text
+import tempfile
+import threading
+import time
+import unittest
+
+
+class TestMeteredPool(unittest.TestCase):
+    """Load tests the MeteredPool class over a SQLite file"""
+    threads = 12
+    queries = 20
+
+    def setUp(self):
+        """creates an engine with a small pool"""
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "pool.db")
+        self.engine = create_engine("sqlite:///" + path,
+                                    poolclass=MeteredPool, pool_size=2,
+                                    max_overflow=1, pool_timeout=5)
+
+    def tearDown(self):
+        """closes the engine"""
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_pep8_conformance_pool(self):
+        """Test that pool.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/pool.py',
+            'tests/test_models/test_engine/test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_load(self):
+        """test that threads outnumbering the connections queue for them
+        and that every checkout and its wait is counted"""
+        failures = []
+        busiest = []
+
+        def work():
+            """runs queries holding the connection for a while"""
+            for i in range(self.queries):
+                try:
+                    with self.engine.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                        busiest.append(self.engine.pool.checkedout())
+                        time.sleep(0.002)
+                except Exception as e:
+                    failures.append(e)
+
+        workers = [threading.Thread(target=work)
+                   for n in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        self.assertLessEqual(max(busiest), 3)
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["checkouts"], self.threads * self.queries)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertGreater(stats["max_wait_ms"], 1)
+        self.assertGreaterEqual(stats["wait_ms"], stats["max_wait_ms"])
+
+    def test_timeout(self):
+        """test that a checkout giving up is counted"""
+        self.engine.pool._timeout = 0.05
+        held = [self.engine.connect() for i in range(3)]
+        self.assertEqual(self.engine.pool.stats()["overflow"], 1)
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        for conn in held:
+            conn.close()
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["checkouts"], 4)
+        self.assertGreaterEqual(stats["max_wait_ms"], 50)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Contains the TestRWLock class
+"""
+
+from models.engine import rwlock
+import pep8
+import threading
+import time
+import unittest
+RWLock = rwlock.RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+    def test_pep8_conformance_rwlock(self):
+        """Test that rwlock.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/rwlock.py',
+            'tests/test_models/test_engine/test_rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_readers_share(self):
+        """test that several threads can read at the same time"""
+        lock = RWLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def read():
+            """waits inside the lock for the other readers"""
+            with lock.reading():
+                inside.wait()
+
+        threads = [threading.Thread(target=read) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+    def test_writer_excludes_readers(self):
+        """test that a reader waits until the writer is done"""
+        lock = RWLock()
+        events = []
+        writing = threading.Event()
+
+        def read():
+            """reads once the writer holds the lock"""
+            writing.wait()
+            with lock.reading():
+                events.append("read")
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        with lock.writing():
+            writing.set()
+            time.sleep(0.05)
+            events.append("wrote")
+        reader.join()
+        self.assertEqual(events, ["wrote", "read"])
+
+    def test_reentrant(self):
+        """test that a writer can read and write again, and a reader
+        can read again"""
+        lock = RWLock()
+        with lock.writing():
+            with lock.reading():
+                with lock.writing():
+                    pass
+        with lock.reading():
+            with lock.reading():
+                pass
+        with lock.writing():
+            pass
+
+    def test_no_upgrade(self):
+        """test that a reader cannot take the write lock"""
+        lock = RWLock()
+        with lock.reading():
+            with self.assertRaises(RuntimeError):
+                with lock.writing():
+                    pass
+        with lock.writing():
+            pass
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs and TestSerializers classes
+"""
+
+import gc
+import inspect
+import io
+import migrate_storage
+import models
+from models.engine import file_storage, serializers
+from models.state import State
+import os
+import pep8
+from tests.temporary_storage import TemporaryStorage
+import unittest
+import warnings
+FileStorage = file_storage.FileStorage
+records = [("State.1", {"__class__": "State", "id": "1", "name": "Borno"}),
+           ("City.2", {"__class__": "City", "id": "2", "rank": [1, 2.5]})]
+
+
+def available():
+    """yields the serializers whose modules are installed"""
+    for name in serializers.serializers:
+        try:
+            yield serializers.get(name)
+        except ValueError:
+            continue
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of serializers"""
+    def test_pep8_conformance_serializers(self):
+        """Test that serializers.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/serializers.py',
+            'tests/test_models/test_engine/test_serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_docstrings(self):
+        """Test for the presence of docstrings in the serializers"""
+        self.assertTrue(len(serializers.__doc__) >= 1)
+        for cls in serializers.serializers.values():
+            self.assertTrue(len(cls.__doc__) >= 1)
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the serializers FileStorage can use"""
+    def test_round_trip(self):
+        """test that every serializer reads back what it wrote"""
+        for serializer in available():
+            with self.subTest(name=serializer.name):
+                f = io.BytesIO()
+                f.write(serializer.header)
+                serializer.dump(iter(records), f)
+                f = io.BufferedReader(io.BytesIO(f.getvalue()))
+                found = serializers.detect(f, serializer.name)
+                self.assertEqual(found.name, serializer.name)
+                self.assertEqual(list(found.load(f)), records)
+
+    def test_load_leaves_file_open(self):
+        """test that loading neither closes nor leaks the file it reads"""
+        for serializer in available():
+            with self.subTest(name=serializer.name):
+                f = io.BytesIO()
+                f.write(serializer.header)
+                serializer.dump(iter(records), f)
+                f.seek(len(serializer.header))
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    self.assertEqual(list(serializer.load(f)), records)
+                    gc.collect()
+                self.assertFalse(f.closed)
+                self.assertEqual([w for w in caught
+                                  if w.category is ResourceWarning], [])
+
+    def test_truncated(self):
+        """test that a cut off snapshot raises ValueError"""
+        for serializer in available():
+            with self.subTest(name=serializer.name):
+                f = io.BytesIO()
+                f.write(serializer.header)
+                serializer.dump(iter(records), f)
+                f = io.BufferedReader(io.BytesIO(f.getvalue()[:-3]))
+                with self.assertRaises(ValueError):
+                    list(serializers.detect(f).load(f))
+
+    def test_json_matches_stdlib(self):
+        """test that the json serializer writes what json.dump did"""
+        f = io.BytesIO()
+        serializers.get("json").dump(iter(records), f)
+        self.assertEqual(f.getvalue().decode(),
+                         serializers.json.dumps(dict(records)))
+
+    def test_unknown(self):
+        """test that an unknown format is refused"""
+        with self.assertRaises(ValueError):
+            serializers.get("yaml")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageFormats(TemporaryStorage, unittest.TestCase):
+    """Test that FileStorage saves with the configured serializer"""
+    attrs = TemporaryStorage.attrs + ["format"]
+
+    def setUp(self):
+        """points the storage at a temporary snapshot"""
+        super().setUp()
+        self.storage = FileStorage()
+
+    def test_reload_detects_format(self):
+        """test that a snapshot is read back whatever format wrote it"""
+        state = State(name='Yobe')
+        self.storage.new(state)
+        for serializer in available():
+            with self.subTest(name=serializer.name):
+                FileStorage._FileStorage__format = serializer.name
+                self.storage.compact()
+                FileStorage._FileStorage__format = "json"
+                FileStorage._FileStorage__objects = {}
+                self.storage.reload()
+                self.assertEqual(self.storage.get(State, state.id).name,
+                                 'Yobe')
+
+    def test_migrate(self):
+        """test that migrate_storage rewrites a snapshot in place, keeping
+        its mode and no temporary file"""
+        state = State(name='Kebbi')
+        self.storage.new(state)
+        self.storage.compact()
+        path = FileStorage._FileStorage__file_path
+        os.chmod(path, 0o600)
+        for serializer in available():
+            with self.subTest(name=serializer.name):
+                migrate_storage.migrate(serializer.name, path)
+                with open(path, "rb") as f:
+                    self.assertEqual(serializers.detect(f).name,
+                                     serializer.name if serializer.header
+                                     else "json")
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+                self.assertEqual(os.listdir(os.path.dirname(path)),
+                                 [os.path.basename(path)])
+                FileStorage._FileStorage__objects = {}
+                self.storage.reload()
+                self.assertEqual(self.storage.count(State), 1)
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Contains the TestTextIndex class
+"""
+
+from models.engine.text import TextIndex, tokenize
+import pep8
+import unittest
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class and the tokenizer"""
+    def setUp(self):
+        """indexes a few documents"""
+        self.texts = TextIndex()
+        self.texts.set("a", "Quiet cabin by the lake")
+        self.texts.set("b", "Lake view, lake access, lake house")
+        self.texts.set("c", "Loft downtown, close to the lake")
+        self.texts.set("d", "Downtown loft with a rooftop")
+
+    def test_pep8_conformance_text(self):
+        """Test that text.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/text.py',
+            'tests/test_models/test_engine/test_text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_tokenize(self):
+        """test that texts are split in lowercase words"""
+        self.assertEqual(tokenize("Lake-view, 2 BEDS_ok!"),
+                         ["lake", "view", "2", "beds", "ok"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_ranking(self):
+        """test that frequent and rare words weigh as BM25 says"""
+        keys = [key for score, key in self.texts.search("lake")]
+        self.assertEqual(keys[0], "b")
+        self.assertCountEqual(keys, ["a", "b", "c"])
+        keys = [key for score, key in self.texts.search("lake rooftop")]
+        self.assertEqual(keys[0], "d")
+        self.assertEqual(self.texts.search("nothing"), [])
+        scores = [score for score, key in self.texts.search("cabin")]
+        self.assertGreater(self.texts.search("cabin", 1000)[0][0],
+                           scores[0])
+
+    def test_set_and_remove(self):
+        """test that documents are replaced and dropped"""
+        self.texts.set("a", "rooftop garden")
+        self.assertEqual(self.texts.search("cabin"), [])
+        self.assertCountEqual([key for s, key in
+                               self.texts.search("rooftop")], ["a", "d"])
+        self.texts.remove("d")
+        self.texts.remove("d")
+        self.texts.set("c", "")
+        self.assertEqual(len(self.texts), 2)
+        self.assertEqual([key for s, key in self.texts.search("loft")], [])
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+"""
+Contains the QueryCounter class, the TestQueryCounts class, which keeps
+the pages walking relationships from running a query per object, and the
+TestCachedGet class
+"""
+
+import importlib
+import models
+from models.engine.cache import ObjectCache
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import pep8
+from sqlalchemy import event
+import unittest
+
+
+class QueryCounter:
+    """context manager recording the SQL statements the storage runs"""
+
+    def __init__(self):
+        """initializes a counter over the engine of the storage"""
+        self.engine = models.storage._DBStorage__engine
+        self.statements = []
+
+    def __enter__(self):
+        """starts recording"""
+        event.listen(self.engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, *args):
+        """stops recording"""
+        event.remove(self.engine, "before_cursor_execute", self.record)
+
+    def __len__(self):
+        """returns the number of statements recorded"""
+        return len(self.statements)
+
+    def record(self, conn, cursor, statement, *args):
+        """records a statement about to run"""
+        self.statements.append(statement)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestQueryCounts(unittest.TestCase):
+    """Test that relationships are loaded in a fixed number of queries"""
+    states = 4
+    cities = 3
+
+    def setUp(self):
+        """saves a few states with cities, and a place with amenities and
+        reviews, then starts from an empty session"""
+        storage = models.storage
+        user = User(email='n@plus.one', password='pwd')
+        user.save()
+        self.ids = []
+        for i in range(self.states):
+            state = State(name='State {}'.format(i))
+            state.save()
+            self.ids.append(state.id)
+            for j in range(self.cities):
+                City(name='City {}-{}'.format(i, j),
+                     state_id=state.id).save()
+        city = City(name='Capital', state_id=self.ids[0])
+        city.save()
+        place = Place(name='Home', city_id=city.id, user_id=user.id)
+        place.save()
+        for name in ('Wifi', 'Pool'):
+            amenity = Amenity(name=name)
+            amenity.save()
+            place.amenities.append(amenity)
+        place.save()
+        for text in ('Nice', 'Noisy'):
+            Review(text=text, place_id=place.id, user_id=user.id).save()
+        self.place_id = place.id
+        storage.close()
+
+    def test_pep8_conformance_queries(self):
+        """Test that test_queries.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_queries.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_counter_sees_lazy_loads(self):
+        """test that walking cities without a hint costs a query each"""
+        with QueryCounter() as queries:
+            states = models.storage.all(State).values()
+            for state in states:
+                list(state.cities)
+        self.assertEqual(len(queries), 1 + len(states))
+
+    def test_all_with_hint(self):
+        """test that the cities of every state come in one more query"""
+        with QueryCounter() as queries:
+            states = models.storage.all(State, load=("cities",)).values()
+            names = [city.name for state in states for city in state.cities]
+        self.assertGreaterEqual(len(names), self.states * self.cities)
+        self.assertEqual(len(queries), 2)
+        with QueryCounter() as queries:
+            states = models.storage.all(State, load=("cities.places",))
+            for state in states.values():
+                for city in state.cities:
+                    list(city.places)
+        self.assertEqual(len(queries), 3)
+
+    def test_get_with_hint(self):
+        """test that get loads the named relationships along"""
+        with QueryCounter() as queries:
+            place = models.storage.get(Place, self.place_id,
+                                       load=("amenities", "reviews",
+                                             "cities.state"))
+            self.assertEqual(len(place.amenities), 2)
+            self.assertEqual(len(place.reviews), 2)
+            self.assertEqual(place.cities.state.id, self.ids[0])
+        self.assertEqual(len(queries), 3)
+
+    def test_pages(self):
+        """test that the pages listing the cities of every state run the
+        same number of queries however many states there are"""
+        for module, url, count in (("8-cities_by_states",
+                                    "/cities_by_states", 2),
+                                   ("10-hbnb_filters", "/hbnb_filters", 3)):
+            app = importlib.import_module("web_flask." + module).app
+            with app.test_client() as client:
+                with QueryCounter() as queries:
+                    resp = client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn(b"City 0-0", resp.data)
+            self.assertEqual(len(queries), count)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestCachedGet(unittest.TestCase):
+    """Test that get() reads the objects it cached without a query"""
+
+    def setUp(self):
+        """gives the storage a cache and saves a state and a user"""
+        storage = models.storage
+        self.saved = storage._DBStorage__cache
+        storage._DBStorage__cache = ObjectCache(2, 60)
+        self.addCleanup(setattr, storage, "_DBStorage__cache", self.saved)
+        self.state = State(name='Cached')
+        self.state.save()
+        self.user = User(email='c@a.che', password='pwd')
+        self.user.save()
+        storage.close()
+
+    def test_hit(self):
+        """test that a cached object is built without a query, its
+        password untouched, and still loads its relationships"""
+        storage = models.storage
+        with QueryCounter() as queries:
+            state = storage.get(State, self.state.id)
+            user = storage.get(User, self.user.id)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(state.name, 'Cached')
+        self.assertEqual(state.created_at, self.state.created_at)
+        self.assertEqual(user.password, self.user.password)
+        self.assertIs(storage.get(State, self.state.id), state)
+        self.assertEqual(state.cities, [])
+        self.assertEqual(storage.metrics()["cache_hits"], 2)
+
+    def test_write_through(self):
+        """test that saved changes replace the cached columns and deleted
+        objects leave the cache"""
+        storage = models.storage
+        state = storage.get(State, self.state.id)
+        state.name = 'Renamed'
+        storage.all(City)
+        storage.close()
+        self.assertEqual(storage.get(State, self.state.id).name, 'Cached')
+        storage.close()
+        state = storage.get(State, self.state.id)
+        state.name = 'Renamed'
+        state.save()
+        storage.close()
+        with QueryCounter() as queries:
+            self.assertEqual(storage.get(State, self.state.id).name,
+                             'Renamed')
+        self.assertEqual(len(queries), 0)
+        storage.delete(storage.get(State, self.state.id))
+        storage.save()
+        storage.close()
+        self.assertIsNone(storage.get(State, self.state.id))
+
+    def test_eviction(self):
+        """test that the least recently read object is evicted and read
+        back with a query"""
+        storage = models.storage
+        amenity = Amenity(name='Sauna')
+        amenity.save()
+        storage.close()
+        with QueryCounter() as queries:
+            storage.get(State, self.state.id)
+        self.assertEqual(len(queries), 1)
+        metrics = storage.metrics()
+        self.assertEqual(metrics["cache_evictions"], 2)
+        self.assertIsNone(storage.get(User, self.user.id).first_name)
+        self.assertEqual(metrics["cache_entries"], 2)